@@ -0,0 +1,107 @@
+# ══════════════════════════════════════════════════════════════
+# BENCHMARK — cache/playlist saves: row-by-row INSERT vs COPY + merge
+# Usage: DATABASE_URL=... python benchmarks/bench_bulk_save.py [--sizes 25,500,5000]
+# Runs in a scratch schema (bench_bulk_save) that is dropped afterwards.
+# ══════════════════════════════════════════════════════════════
+
+import os, sys, time, random, argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+SCHEMA = "bench_bulk_save"
+os.environ["PGOPTIONS"] = f"-c search_path={SCHEMA}"  # every libpq connection lands in the scratch schema
+
+import psycopg
+import database as db
+
+UPDATES = ", ".join(f"{col}=EXCLUDED.{col}" for col in db.VIDEO_COLUMNS if col != "video_id")
+
+
+def legacy_save_cached_videos(videos, category, score_version=None):
+    """Reference: the one-INSERT-per-video save_cached_videos() used before COPY."""
+    with db._conn() as conn:
+        c = conn.cursor()
+        c.execute("DELETE FROM cached_videos WHERE category = %s", (category,))
+        for v in videos:
+            c.execute(f"""
+                INSERT INTO cached_videos ({", ".join(db.VIDEO_COLUMNS)}, category)
+                VALUES ({", ".join(["%s"] * (len(db.VIDEO_COLUMNS) + 1))})
+                ON CONFLICT (category, generation, video_id) DO UPDATE SET {UPDATES}, fetched_at=CURRENT_TIMESTAMP
+            """, db._video_row(v, score_version) + (category,))
+        conn.commit()
+        db._refresh_ranking(conn)
+
+
+def legacy_save_playlist_videos(videos, score_version=None):
+    with db._conn() as conn:
+        c = conn.cursor()
+        for idx, v in enumerate(videos):
+            c.execute(f"""
+                INSERT INTO playlist_videos ({", ".join(db.VIDEO_COLUMNS)}, position)
+                VALUES ({", ".join(["%s"] * (len(db.VIDEO_COLUMNS) + 1))})
+                ON CONFLICT (video_id) DO UPDATE SET {UPDATES}, position=EXCLUDED.position,
+                    fetched_at=CURRENT_TIMESTAMP
+            """, db._video_row(v, score_version) + (idx,))
+        conn.commit()
+
+
+def make_videos(n, rnd):
+    return [{
+        "video_id": f"vid{i:07d}", "url": f"https://www.youtube.com/watch?v=vid{i:07d}",
+        "title": f"Artist {i % 97} - Aria {i}", "artist": f"Artist {i % 97}", "song": f"Aria {i}",
+        "channel": f"Channel {i % 31}", "year": 2000 + i % 25, "published": "2020-01-01",
+        "duration": rnd.randint(60, 600), "views": rnd.randint(0, 10**7), "hd": bool(i % 2),
+        "thumbnail": "", "posted": False,
+        "score": {"total": rnd.randint(0, 100), "fixed": 0, "guia": 0.0, "artist_match": None,
+                  "song_match": None, "reasons": [{"tag": "quality", "label": "HD", "points": 10}]},
+    } for i in range(n)]
+
+
+def timed(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main_bench():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="25,500,5000")
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+
+    with psycopg.connect(db.DATABASE_URL, autocommit=True) as admin:
+        admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        admin.execute(f"CREATE SCHEMA {SCHEMA}")
+    try:
+        db.init_db()
+        rnd = random.Random(7)
+        print(f"{'rows':>6} {'table':>16} {'row-by-row':>12} {'COPY+merge':>12} {'speedup':>8}")
+        for n in (int(x) for x in args.sizes.split(",")):
+            videos = make_videos(n, rnd)
+            for table, old_fn, new_fn in (
+                ("cached_videos", lambda: legacy_save_cached_videos(videos, "bench"),
+                 lambda: db.save_cached_videos(videos, "bench")),
+                ("playlist_videos", lambda: legacy_save_playlist_videos(videos),
+                 lambda: db.save_playlist_videos(videos)),
+            ):
+                old = timed(old_fn, args.rounds)
+                new = timed(new_fn, args.rounds)
+                print(f"{n:>6} {table:>16} {old * 1000:>10.1f}ms {new * 1000:>10.1f}ms {old / new:>7.1f}x")
+            with db._conn() as conn:
+                stored = conn.execute("SELECT count(*) FROM cached_videos WHERE category = 'bench'").fetchone()[0]
+                assert stored == n, f"cached_videos has {stored} rows, expected {n}"
+                stored = conn.execute("SELECT count(*) FROM playlist_videos").fetchone()[0]
+                assert stored >= n, f"playlist_videos has {stored} rows, expected >= {n}"
+    finally:
+        with psycopg.connect(db.DATABASE_URL, autocommit=True) as admin:
+            admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+
+if __name__ == "__main__":
+    main_bench()
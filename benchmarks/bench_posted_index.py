@@ -0,0 +1,92 @@
+# ══════════════════════════════════════════════════════════════
+# BENCHMARK — is_posted(): linear registry scan vs PostedIndex
+# Usage: python benchmarks/bench_posted_index.py [--scale N]
+# ══════════════════════════════════════════════════════════════
+
+import os, sys, csv, time, random, argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+import main
+
+
+def linear_is_posted(registry, artist: str, song: str) -> bool:
+    """Reference: the original per-entry scan is_posted() used before the index."""
+    na, ns = main.normalize_str(artist), main.normalize_str(song)
+    if not na and not ns: return False
+    stop = main.POSTED_STOP
+    for ra, rs in registry:
+        if ra == na and rs == ns: return True
+        aw = set(na.split()) - stop; rw = set(ra.split()) - stop
+        am = (len(aw&rw) >= min(2,len(aw)) or ra in na or na in ra) if aw and rw else False
+        sw = set(ns.split()) - stop; rsw = set(rs.split()) - stop
+        sm = (len(sw&rsw) >= min(2,len(sw)) or rs in ns or ns in rs) if sw and rsw else False
+        if am and sm: return True
+    return False
+
+
+def load_rows():
+    with open(main.DATASET_PATH, encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def build_registry(rows, scale: int):
+    pairs = [(e["artist_norm"], e["song_norm"]) for e in main._read_posted_csv()]
+    registry = set(pairs)
+    if scale > 1:
+        # Grow the registry with artist x song recombinations (plausible but mostly unposted pairs)
+        rnd = random.Random(7)
+        artists = sorted({a for a, _ in registry}); songs = sorted({s for _, s in registry if s})
+        while len(registry) < len(pairs) * scale:
+            registry.add((rnd.choice(artists), rnd.choice(songs)))
+    return registry
+
+
+def build_queries(rows):
+    queries = []
+    for r in rows:
+        queries.append(main.extract_artist_song(r.get("Título do Vídeo", "")))
+        queries.append((r.get("Nome do Cantor", ""), r.get("Nome da Música", "")))
+    queries += [("Luciano Pavarotti", "Nessun Dorma"), ("Unknown Choir", "Ave Maria"), ("x", "y")]
+    return queries
+
+
+def timed(fn, queries, rounds):
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        out = [fn(a, s) for a, s in queries]
+    return (time.perf_counter() - t0) / (rounds * len(queries)), out
+
+
+def main_bench():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scale", type=int, default=1, help="multiply registry size with synthetic pairs")
+    ap.add_argument("--rounds", type=int, default=5)
+    args = ap.parse_args()
+
+    rows = load_rows()
+    registry = build_registry(rows, args.scale)
+    queries = build_queries(rows)
+
+    t0 = time.perf_counter()
+    main.posted_registry = registry
+    main.posted_index = main.PostedIndex.build(registry)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    lin, lin_out = timed(lambda a, s: linear_is_posted(registry, a, s), queries, args.rounds)
+    idx, idx_out = timed(main.is_posted, queries, args.rounds)
+    assert lin_out == idx_out, "index and linear scan disagree"
+
+    print(f"registry entries : {len(registry)}")
+    print(f"queries          : {len(queries)} ({sum(idx_out)} posted)")
+    print(f"index build      : {build_ms:.1f} ms")
+    print(f"linear scan      : {lin * 1e6:8.1f} µs/query")
+    print(f"PostedIndex      : {idx * 1e6:8.1f} µs/query")
+    print(f"speedup          : {lin / idx:.1f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
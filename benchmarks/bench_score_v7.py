@@ -0,0 +1,143 @@
+# ══════════════════════════════════════════════════════════════
+# BENCHMARK — calc_score_v7(): per-list substring loops vs KeywordMatcher
+# Usage: python benchmarks/bench_score_v7.py [--rounds N]
+# ══════════════════════════════════════════════════════════════
+
+import os, sys, csv, time, argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+import main
+
+
+def legacy_calc_score_v7(v: dict, category: str = None) -> dict:
+    """Reference: the list-by-list scorer calc_score_v7() used before KeywordMatcher."""
+    reasons = []
+    total = 0
+    title_low = (v.get("title") or "").lower()
+    artist_low = (v.get("artist") or "").lower()
+    song_low = (v.get("song") or "").lower()
+    channel_low = (v.get("channel") or "").lower()
+
+    hit_match = None
+    for hit in main.ELITE_HITS:
+        hl = hit.lower()
+        if hl in song_low or hl in title_low:
+            hit_match = hit
+            break
+    if hit_match:
+        total += 15
+        reasons.append({"tag": "elite_hit", "label": hit_match, "points": 15})
+
+    name_match = None
+    for name in main.POWER_NAMES:
+        nl = name.lower()
+        if nl in artist_low or nl in channel_low or nl in title_low:
+            name_match = name
+            break
+    if name_match:
+        total += 15
+        reasons.append({"tag": "power_name", "label": name_match, "points": 15})
+
+    specialty_match = None
+    if hit_match and name_match:
+        specialty_match = f"{name_match} + {hit_match}"
+    elif category and category in main.CATEGORY_SPECIALTY:
+        for kw in main.CATEGORY_SPECIALTY[category]:
+            if kw in title_low or kw in channel_low:
+                specialty_match = kw
+                break
+    if specialty_match:
+        total += 25
+        reasons.append({"tag": "specialty", "label": specialty_match, "points": 25})
+
+    voice_match = None
+    for kw in main.VOICE_KEYWORDS:
+        if kw in title_low:
+            voice_match = kw
+            break
+    if voice_match:
+        total += 15
+        reasons.append({"tag": "voice", "label": voice_match, "points": 15})
+
+    inst_match = None
+    for ch in main.INSTITUTIONAL_CHANNELS:
+        if ch in channel_low:
+            inst_match = v.get("channel", "")
+            break
+    if inst_match:
+        total += 10
+        reasons.append({"tag": "institutional", "label": inst_match, "points": 10})
+
+    if v.get("hd"):
+        total += 10
+        reasons.append({"tag": "quality", "label": "HD", "points": 10})
+
+    views = v.get("views", 0)
+    if views > 100000:
+        total += 10
+        reasons.append({"tag": "views", "label": f"{views:,}", "points": 10})
+
+    total = min(total, 100)
+    return {"total": total, "reasons": reasons, "fixed": 0, "guia": 0.0,
+            "artist_match": name_match, "song_match": hit_match}
+
+
+def load_videos():
+    videos = []
+    with open(main.DATASET_PATH, encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            title = r.get("Título do Vídeo", "")
+            artist, song = main.extract_artist_song(title)
+            views = r.get("Visualizações", "") or "0"
+            videos.append({
+                "title": title, "artist": artist, "song": song or title,
+                "channel": r.get("Nome do Cantor", ""), "hd": True,
+                "views": int(float(views)) if views.replace(".", "", 1).isdigit() else 0,
+            })
+    return videos
+
+
+def timed(fn, cases, rounds):
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        out = [fn(v, cat) for v, cat in cases]
+    return (time.perf_counter() - t0) / (rounds * len(cases)), out
+
+
+def main_bench():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=20)
+    args = ap.parse_args()
+
+    videos = load_videos()
+    cats = [None] + list(main.CATEGORIES_V7)
+    cases = [(v, c) for v in videos for c in cats]
+
+    t0 = time.perf_counter()
+    main.build_v7_matcher()
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    old, old_out = timed(legacy_calc_score_v7, cases, args.rounds)
+    new, new_out = timed(main.calc_score_v7, cases, args.rounds)
+    assert old_out == new_out, "KeywordMatcher scores differ from the legacy scorer"
+
+    # Same matcher without pyahocorasick (regex fallback)
+    automaton, main.V7_MATCHER.automaton = main.V7_MATCHER.automaton, None
+    rx, rx_out = timed(main.calc_score_v7, cases, args.rounds)
+    main.V7_MATCHER.automaton = automaton
+    assert old_out == rx_out, "regex fallback scores differ from the legacy scorer"
+
+    print(f"videos x categories : {len(videos)} x {len(cats)} = {len(cases)}")
+    print(f"matcher build       : {build_ms:.1f} ms")
+    print(f"legacy loops        : {old * 1e6:8.1f} µs/video")
+    print(f"KeywordMatcher      : {new * 1e6:8.1f} µs/video  ({'aho-corasick' if automaton else 'regex'})")
+    print(f"  regex fallback    : {rx * 1e6:8.1f} µs/video")
+    print(f"speedup             : {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -3,12 +3,19 @@
 # Uses psycopg 3 (modern driver with bundled libpq binary)
 # ══════════════════════════════════════════════════════════════
 
-import os, io, csv, json
+import os, io, csv, json, threading
+from contextlib import contextmanager
 from datetime import datetime, date
 from typing import List, Dict, Optional
 
 import psycopg
 from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:
+    ConnectionPool = None
 
 DATABASE_URL = os.getenv("DATABASE_URL", "")
 if not DATABASE_URL:
@@ -18,20 +25,82 @@ else:
     print(f"🔗 DATABASE_URL loaded from env var")
 
 
-def _conn():
-    if not DATABASE_URL:
-        raise RuntimeError("DATABASE_URL not set — add PostgreSQL on Railway")
-    return psycopg.connect(DATABASE_URL)
+# ─── CONNECTION POOL ───
+# One process-wide pool, opened in the app lifespan. Without psycopg_pool (or
+# before open_pool()) every _conn() falls back to a fresh connection.
+# Each worker also opens the async pool in database_async.py, which serves the
+# request hot paths; this one is left with background jobs and to_thread calls.
+# Per-worker ceiling: DB_POOL_MAX + DB_ASYNC_POOL_MAX (+1 for the NOTIFY listener).
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "4"))               # sync pool
+DB_ASYNC_POOL_MIN = int(os.getenv("DB_ASYNC_POOL_MIN", "1"))
+DB_ASYNC_POOL_MAX = int(os.getenv("DB_ASYNC_POOL_MAX", "6"))   # async pool (database_async.py)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))              # wait for a free connection
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))          # idle extras above min are closed
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))  # connections are recycled after this
 
+pool = None
 
-def init_db():
+
+def open_pool():
+    global pool
+    if not DATABASE_URL:
+        raise RuntimeError("DATABASE_URL not set — add PostgreSQL on Railway")
+    if ConnectionPool is None:
+        print("⚠️ psycopg_pool not installed — opening one connection per query")
+        return
+    pool = ConnectionPool(
+        DATABASE_URL, min_size=DB_POOL_MIN, max_size=DB_POOL_MAX, timeout=DB_POOL_TIMEOUT,
+        max_idle=DB_POOL_MAX_IDLE, max_lifetime=DB_POOL_MAX_LIFETIME,
+        check=ConnectionPool.check_connection,  # ping on checkout, drops connections the server closed
+        name="opera", open=False,
+    )
     try:
-        conn = _conn()
+        pool.open(wait=True, timeout=DB_POOL_TIMEOUT)
     except Exception as e:
         print(f"❌ PostgreSQL connection failed: {e}")
+        pool.close()
+        pool = None
         raise
-    c = conn.cursor()
+    print(f"✅ PostgreSQL pool open ({DB_POOL_MIN}-{DB_POOL_MAX} connections)")
+
+
+def close_pool():
+    global pool
+    if pool is not None:
+        pool.close()
+        pool = None
+
+
+def get_pool_stats() -> Dict:
+    if pool is None:
+        return {"pooled": False}
+    return {"pooled": True, **pool.get_stats()}
+
+
+@contextmanager
+def _conn():
+    """Connection for one unit of work: committed on success, rolled back on error, then released"""
+    if pool is not None:
+        with pool.connection() as conn:
+            yield conn
+        return
+    if not DATABASE_URL:
+        raise RuntimeError("DATABASE_URL not set — add PostgreSQL on Railway")
+    with psycopg.connect(DATABASE_URL) as conn:
+        yield conn
+
+
+# ─── SCHEMA MIGRATIONS ───
+# Each migration runs once, in order, inside the transaction that records it
+# in schema_version. A transaction-level advisory lock makes sure only one
+# process migrates; the others wait, re-check, and find nothing to do. When
+# the schema is current, init_db() is a version check and runs no DDL.
+MIGRATION_LOCK_ID = 7_001_001
 
+
+def _migration_001_baseline(c):
+    """V7 schema as it stood before versioned migrations (idempotent: safe on existing databases)"""
     # Table: cached_videos
     c.execute("""
         CREATE TABLE IF NOT EXISTS cached_videos (
@@ -55,8 +124,7 @@ def init_db():
             artist_match TEXT,
             song_match TEXT,
             posted BOOLEAN,
-            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(video_id, category)
+            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
     c.execute("CREATE INDEX IF NOT EXISTS idx_category ON cached_videos(category)")
@@ -91,6 +159,45 @@ def init_db():
     """)
     c.execute("CREATE INDEX IF NOT EXISTS idx_playlist_score ON playlist_videos(score_total DESC)")
 
+    # Stored score breakdown + version of the scoring rules that produced it
+    for table in ("cached_videos", "playlist_videos"):
+        for col in ("score_reasons", "score_version"):
+            c.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {col} TEXT")
+
+    # Cache generations: each category refresh writes a new generation and
+    # flips cache_generations.active to it in the same commit. Readers go
+    # through live_cached_videos, so they only ever see a complete generation.
+    c.execute("CREATE SEQUENCE IF NOT EXISTS cache_generation_seq")
+    c.execute("ALTER TABLE cached_videos ADD COLUMN IF NOT EXISTS generation BIGINT NOT NULL DEFAULT 0")
+    c.execute("ALTER TABLE cached_videos DROP CONSTRAINT IF EXISTS cached_videos_video_id_category_key")
+    c.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_cached_generation_video
+        ON cached_videos(category, generation, video_id)
+    """)
+    c.execute("DROP INDEX IF EXISTS idx_category_posted_score")
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_category_generation_score
+        ON cached_videos(category, generation, posted, score_total DESC)
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS cache_generations (
+            category TEXT PRIMARY KEY,
+            active BIGINT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # Rows written before generations existed are generation 0
+    c.execute("""
+        INSERT INTO cache_generations (category, active)
+        SELECT DISTINCT category, 0 FROM cached_videos WHERE generation = 0
+        ON CONFLICT (category) DO NOTHING
+    """)
+    c.execute("""
+        CREATE OR REPLACE VIEW live_cached_videos AS
+        SELECT cv.* FROM cached_videos cv
+        JOIN cache_generations g ON g.category = cv.category AND g.active = cv.generation
+    """)
+
     # Table: system_config
     c.execute("""
         CREATE TABLE IF NOT EXISTS system_config (
@@ -132,6 +239,97 @@ def init_db():
         )
     """)
 
+    # Materialized view: ranking_videos (cross-category leaderboard, one row per video)
+    c.execute("""
+        SELECT 1 FROM pg_matviews
+        WHERE matviewname = 'ranking_videos' AND definition NOT LIKE '%%live_cached_videos%%'
+    """)
+    if c.fetchone():
+        c.execute("DROP MATERIALIZED VIEW ranking_videos")  # predates generations: rebuilt below
+    c.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS ranking_videos AS
+        SELECT DISTINCT ON (video_id)
+            video_id, url, title, artist, song, channel, year, published, duration,
+            views, hd, thumbnail, category, score_total, score_fixed, score_guia,
+            artist_match, song_match, posted, score_reasons, score_version, fetched_at
+        FROM live_cached_videos
+        ORDER BY video_id, score_total DESC, fetched_at DESC
+    """)
+    c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_ranking_video ON ranking_videos(video_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_ranking_score ON ranking_videos(score_total DESC)")
+
+    # Table: category_prefetch (next seed's results staged ahead of rotation)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS category_prefetch (
+            category_id TEXT PRIMARY KEY,
+            seed_index INTEGER NOT NULL,
+            seed_query TEXT,
+            videos TEXT,
+            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Table: posted_registry (videos already posted — shared by all workers)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS posted_registry (
+            id SERIAL PRIMARY KEY,
+            artist TEXT NOT NULL,
+            song TEXT,
+            artist_norm TEXT NOT NULL,
+            song_norm TEXT NOT NULL DEFAULT '',
+            source TEXT,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(artist_norm, song_norm)
+        )
+    """)
+
+    for col in ("cache_hits", "cache_misses"):
+        c.execute(f"ALTER TABLE quota_usage ADD COLUMN IF NOT EXISTS {col} INTEGER DEFAULT 0")
+
+    # Table: search_cache (TTL cache of live YouTube search results)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS search_cache (
+            cache_key TEXT PRIMARY KEY,
+            query TEXT,
+            max_results INTEGER,
+            results TEXT,
+            hits INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_hit_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_last_hit ON search_cache(last_hit_at)")
+
+    # Table: video_details (videos.list payloads shared by searches and playlist)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS video_details (
+            video_id TEXT PRIMARY KEY,
+            details TEXT,
+            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Table: refresh_runs (one row per background cache refresh)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS refresh_runs (
+            id SERIAL PRIMARY KEY,
+            kind TEXT NOT NULL,
+            status TEXT DEFAULT 'running',
+            details TEXT,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    """)
+
+    # Table: job_leases (cross-worker lock for background jobs)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS job_leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT,
+            expires_at TIMESTAMP
+        )
+    """)
+
     # Table: production_projects (APP2 — Content Production)
     c.execute("""
         CREATE TABLE IF NOT EXISTS production_projects (
@@ -168,182 +366,519 @@ def init_db():
         except Exception:
             pass
 
-    conn.commit()
-    conn.close()
-    print("✅ Database initialized (PostgreSQL V7)")
+
+PROD_JSON_COLUMNS = ("transcription_segments", "overlay_subtitles", "youtube_seo", "translations")
+
+
+def _migration_002_prod_jsonb(c):
+    """production_projects payloads: TEXT holding JSON -> JSONB"""
+    # Anything that doesn't parse is kept as a JSON string rather than failing the migration
+    c.execute("""
+        CREATE FUNCTION pg_temp.try_jsonb(t TEXT) RETURNS JSONB AS $$
+        BEGIN
+            RETURN t::jsonb;
+        EXCEPTION WHEN others THEN
+            RETURN to_jsonb(t);
+        END $$ LANGUAGE plpgsql
+    """)
+    for col in PROD_JSON_COLUMNS:
+        c.execute(f"""
+            ALTER TABLE production_projects ALTER COLUMN {col} TYPE JSONB
+            USING CASE WHEN {col} IS NULL OR {col} = '' THEN NULL ELSE pg_temp.try_jsonb({col}) END
+        """)
+
+
+def _migration_003_prod_listing_indexes(c):
+    """Covering index for status polling; keyset indexes for the project list"""
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_prod_status_cover ON production_projects(id)
+        INCLUDE (status, overlay_approved, post_approved, error_message)
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_prod_created ON production_projects(created_at DESC, id DESC)")
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_prod_status_created
+        ON production_projects(status, created_at DESC, id DESC)
+    """)
+
+
+def _migration_004_prod_jsonb_unwrap(c):
+    """Unwrap JSONB strings that hold JSON (legacy double-encoded TEXT) into the value itself"""
+    c.execute("""
+        CREATE OR REPLACE FUNCTION pg_temp.try_jsonb(t TEXT) RETURNS JSONB AS $$
+        BEGIN
+            RETURN t::jsonb;
+        EXCEPTION WHEN others THEN
+            RETURN to_jsonb(t);
+        END $$ LANGUAGE plpgsql
+    """)
+    for col in PROD_JSON_COLUMNS:
+        c.execute(f"""
+            UPDATE production_projects SET {col} = pg_temp.try_jsonb({col} #>> '{{}}')
+            WHERE jsonb_typeof({col}) = 'string' AND ltrim({col} #>> '{{}}') ~ '^[[{{]'
+        """)
+
+
+MIGRATIONS = [
+    (1, "baseline V7 schema", _migration_001_baseline),
+    (2, "production payloads as JSONB", _migration_002_prod_jsonb),
+    (3, "production status/listing indexes", _migration_003_prod_listing_indexes),
+    (4, "unwrap double-encoded production payloads", _migration_004_prod_jsonb_unwrap),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def _schema_version(c) -> int:
+    c.execute("SELECT to_regclass('schema_version') IS NOT NULL")
+    if not c.fetchone()[0]:
+        return 0
+    c.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return c.fetchone()[0]
+
+
+def init_db():
+    """Bring the schema up to SCHEMA_VERSION"""
+    with _conn() as conn:
+        c = conn.cursor()
+        if _schema_version(c) >= SCHEMA_VERSION:
+            print(f"✅ Database schema current (v{SCHEMA_VERSION})")
+            return
+        conn.commit()
+        c.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        current = _schema_version(c)  # another worker may have migrated while we waited
+        for version, description, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            print(f"🔧 Migrating schema to v{version}: {description}")
+            migrate(c)
+            c.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                      (version, description))
+        conn.commit()  # applies everything and releases the lock
+    print(f"✅ Database initialized (PostgreSQL V7, schema v{SCHEMA_VERSION})")
 
 
 # ─── CACHED VIDEOS ───
 
-def save_cached_videos(videos: List[Dict], category: str):
+VIDEO_COLUMNS = ("video_id", "url", "title", "artist", "song", "channel", "year", "published",
+                 "duration", "views", "hd", "thumbnail", "score_total", "score_fixed", "score_guia",
+                 "artist_match", "song_match", "posted", "score_reasons", "score_version")
+
+
+def _video_row(v: Dict, score_version: str) -> tuple:
+    score = v.get("score", {})
+    return (
+        v["video_id"], v["url"], v["title"], v["artist"], v["song"],
+        v["channel"], v["year"], v["published"], v["duration"],
+        v["views"], v["hd"], v["thumbnail"],
+        score.get("total", 0), score.get("fixed", 0), score.get("guia", 0.0),
+        score.get("artist_match"), score.get("song_match"), v.get("posted", False),
+        json.dumps(score.get("reasons", [])), score_version
+    )
+
+
+def _copy_upsert(c, table: str, columns: tuple, rows: List[tuple], conflict: tuple):
+    """COPY rows into a transaction-scoped temp table, then merge with one INSERT ... ON CONFLICT.
+
+    Rows must be unique on the conflict key (ON CONFLICT can't touch a row twice).
+    """
+    cols = ", ".join(columns)
+    stage = f"_stage_{table}"
+    c.execute(f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS SELECT {cols} FROM {table} WITH NO DATA")
+    with c.copy(f"COPY {stage} ({cols}) FROM STDIN") as copy:
+        for r in rows:
+            copy.write_row(r)
+    updates = ", ".join(f"{col}=EXCLUDED.{col}" for col in columns if col not in conflict)
+    c.execute(f"""
+        INSERT INTO {table} ({cols}) SELECT {cols} FROM {stage}
+        ON CONFLICT ({", ".join(conflict)}) DO UPDATE SET {updates}, fetched_at=CURRENT_TIMESTAMP
+    """)
+
+
+def save_cached_videos(videos: List[Dict], category: str, score_version: str = None):
+    """Write a new cache generation for the category and make it the active one"""
     if not videos:
         print(f"⚠️ Skipping cache save for {category}: no videos")
         return
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("DELETE FROM cached_videos WHERE category = %s", (category,))
-    for v in videos:
-        score = v.get("score", {})
+    columns = VIDEO_COLUMNS + ("category", "generation")
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("SELECT nextval('cache_generation_seq')")
+        generation = c.fetchone()[0]
+        # Last occurrence wins for repeated ids, as with the old row-by-row upsert
+        rows = {v["video_id"]: _video_row(v, score_version) + (category, generation) for v in videos}
+        with c.copy(f"COPY cached_videos ({', '.join(columns)}) FROM STDIN") as copy:
+            for r in rows.values():
+                copy.write_row(r)
+        # Flip the pointer; a slower refresh that started earlier can't roll it back
         c.execute("""
-            INSERT INTO cached_videos
-            (video_id, url, title, artist, song, channel, year, published, duration,
-             views, hd, thumbnail, category, score_total, score_fixed, score_guia,
-             artist_match, song_match, posted)
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            ON CONFLICT (video_id, category) DO UPDATE SET
-                url=EXCLUDED.url, title=EXCLUDED.title, artist=EXCLUDED.artist,
-                song=EXCLUDED.song, channel=EXCLUDED.channel, year=EXCLUDED.year,
-                published=EXCLUDED.published, duration=EXCLUDED.duration, views=EXCLUDED.views,
-                hd=EXCLUDED.hd, thumbnail=EXCLUDED.thumbnail, score_total=EXCLUDED.score_total,
-                score_fixed=EXCLUDED.score_fixed, score_guia=EXCLUDED.score_guia,
-                artist_match=EXCLUDED.artist_match, song_match=EXCLUDED.song_match,
-                posted=EXCLUDED.posted, fetched_at=CURRENT_TIMESTAMP
-        """, (
-            v["video_id"], v["url"], v["title"], v["artist"], v["song"],
-            v["channel"], v["year"], v["published"], v["duration"],
-            v["views"], v["hd"], v["thumbnail"], category,
-            score.get("total", 0), score.get("fixed", 0), score.get("guia", 0.0),
-            score.get("artist_match"), score.get("song_match"), v.get("posted", False)
-        ))
+            INSERT INTO cache_generations (category, active, updated_at)
+            VALUES (%s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (category) DO UPDATE SET active = EXCLUDED.active, updated_at = CURRENT_TIMESTAMP
+            WHERE cache_generations.active < EXCLUDED.active
+        """, (category, generation))
+        conn.commit()
+        _refresh_ranking(conn)
+    print(f"💾 Cached {len(videos)} videos for: {category} (generation {generation})")
+    gc_cache_generations(category)
+
+
+def gc_cache_generations(category: str = None) -> int:
+    """Delete rows of generations older than the active one (readers already moved on)"""
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            DELETE FROM cached_videos cv USING cache_generations g
+            WHERE cv.category = g.category AND cv.generation < g.active
+              AND (%s::text IS NULL OR g.category = %s)
+        """, (category, category))
+        removed = c.rowcount
+        conn.commit()
+    return removed
+
+
+def _refresh_ranking(conn):
+    # CONCURRENTLY: readers keep the previous leaderboard until the new one is ready
+    conn.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY ranking_videos")
     conn.commit()
-    conn.close()
-    print(f"💾 Cached {len(videos)} videos for: {category}")
 
 
-def get_cached_videos(category: str, hide_posted: bool = True) -> List[Dict]:
-    conn = _conn()
-    c = conn.cursor(row_factory=dict_row)
-    query = "SELECT * FROM cached_videos WHERE category = %s"
-    params: list = [category]
+RANKING_HIDDEN_QUERY = "SELECT count(*) FROM ranking_videos WHERE posted"
+
+
+def _ranking_query(hide_posted: bool) -> str:
+    query = "SELECT * FROM ranking_videos"
     if hide_posted:
-        query += " AND posted = FALSE"
-    query += " ORDER BY score_total DESC"
-    c.execute(query, params)
-    rows = c.fetchall()
-    conn.close()
-    return [
-        {
-            "video_id": r["video_id"], "url": r["url"], "title": r["title"],
-            "artist": r["artist"], "song": r["song"], "channel": r["channel"],
-            "year": r["year"], "published": r["published"], "duration": r["duration"],
-            "views": r["views"], "hd": bool(r["hd"]), "thumbnail": r["thumbnail"],
-            "category": r["category"],
-            "score": {
-                "total": r["score_total"], "fixed": r.get("score_fixed", 0),
-                "guia": r.get("score_guia", 0),
-                "artist_match": r["artist_match"], "song_match": r["song_match"]
-            },
-            "posted": bool(r["posted"])
-        }
-        for r in rows
-    ]
+        query += " WHERE posted = FALSE"
+    return query + " ORDER BY score_total DESC, views DESC LIMIT %s"
 
 
-# ─── PLAYLIST ───
+def get_ranking_videos(hide_posted: bool = True, limit: int = 60) -> tuple:
+    """(top videos, posted videos left out of the ranking) from the ranking view"""
+    with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        c.execute(_ranking_query(hide_posted), (limit,))
+        rows = c.fetchall()
+        hidden = conn.execute(RANKING_HIDDEN_QUERY).fetchone()[0] if hide_posted else 0
+    return [_video_row_to_dict(r) for r in rows], hidden
 
-def save_playlist_videos(videos: List[Dict]):
+
+def get_cached_videos(category: str, hide_posted: bool = True) -> List[Dict]:
+    with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        query = "SELECT * FROM live_cached_videos WHERE category = %s"
+        params: list = [category]
+        if hide_posted:
+            query += " AND posted = FALSE"
+        query += " ORDER BY score_total DESC"
+        c.execute(query, params)
+        rows = c.fetchall()
+    return [_video_row_to_dict(r) for r in rows]
+
+
+def _video_row_to_dict(r: Dict) -> Dict:
+    d = {
+        "video_id": r["video_id"], "url": r["url"], "title": r["title"],
+        "artist": r["artist"], "song": r["song"], "channel": r["channel"],
+        "year": r["year"], "published": r["published"], "duration": r["duration"],
+        "views": r["views"], "hd": bool(r["hd"]), "thumbnail": r["thumbnail"],
+        "score": {
+            "total": r["score_total"], "fixed": r.get("score_fixed", 0),
+            "guia": r.get("score_guia", 0),
+            "artist_match": r["artist_match"], "song_match": r["song_match"],
+            "reasons": _parse_json_field(r.get("score_reasons")) or [],
+            "version": r.get("score_version"),
+        },
+        "posted": bool(r["posted"])
+    }
+    if "category" in r:
+        d["category"] = r["category"]
+    if "position" in r:
+        d["position"] = r["position"]
+    return d
+
+
+def get_stale_scored_videos(table: str, score_version: str) -> List[Dict]:
+    """Rows of cached_videos / playlist_videos scored by other rules than score_version"""
+    if table not in ("cached_videos", "playlist_videos"):
+        raise ValueError(f"Not a scored table: {table}")
+    source = "live_cached_videos" if table == "cached_videos" else table
+    with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        c.execute(f"SELECT * FROM {source} WHERE score_version IS DISTINCT FROM %s", (score_version,))
+        rows = c.fetchall()
+    return [_video_row_to_dict(r) for r in rows]
+
+
+def update_video_scores(table: str, videos: List[Dict], score_version: str):
+    """Bulk-write recomputed scores (one transaction) without touching fetched_at"""
+    if table not in ("cached_videos", "playlist_videos"):
+        raise ValueError(f"Not a scored table: {table}")
     if not videos:
-        print("⚠️ Skipping playlist save: no videos")
         return
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("DELETE FROM playlist_videos")
-    for idx, v in enumerate(videos):
+    key_sql = ("video_id = %s AND category = %s AND generation = "
+               "(SELECT active FROM cache_generations g WHERE g.category = cached_videos.category)"
+               if table == "cached_videos" else "video_id = %s")
+    params = []
+    for v in videos:
         score = v.get("score", {})
-        c.execute("""
-            INSERT INTO playlist_videos
-            (video_id, url, title, artist, song, channel, year, published, duration,
-             views, hd, thumbnail, score_total, score_fixed, score_guia,
-             artist_match, song_match, posted, position)
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            ON CONFLICT (video_id) DO UPDATE SET
-                url=EXCLUDED.url, title=EXCLUDED.title, artist=EXCLUDED.artist,
-                song=EXCLUDED.song, channel=EXCLUDED.channel, year=EXCLUDED.year,
-                published=EXCLUDED.published, duration=EXCLUDED.duration, views=EXCLUDED.views,
-                hd=EXCLUDED.hd, thumbnail=EXCLUDED.thumbnail, score_total=EXCLUDED.score_total,
-                score_fixed=EXCLUDED.score_fixed, score_guia=EXCLUDED.score_guia,
-                artist_match=EXCLUDED.artist_match, song_match=EXCLUDED.song_match,
-                posted=EXCLUDED.posted, position=EXCLUDED.position, fetched_at=CURRENT_TIMESTAMP
-        """, (
-            v["video_id"], v["url"], v["title"], v["artist"], v["song"],
-            v["channel"], v["year"], v["published"], v["duration"],
-            v["views"], v["hd"], v["thumbnail"],
-            score.get("total", 0), score.get("fixed", 0), score.get("guia", 0.0),
-            score.get("artist_match"), score.get("song_match"), v.get("posted", False), idx
+        key = (v["video_id"], v["category"]) if table == "cached_videos" else (v["video_id"],)
+        params.append((
+            score.get("total", 0), score.get("artist_match"), score.get("song_match"),
+            json.dumps(score.get("reasons", [])), score_version, *key
         ))
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.executemany(f"""
+            UPDATE {table}
+            SET score_total = %s, artist_match = %s, song_match = %s,
+                score_reasons = %s, score_version = %s
+            WHERE {key_sql}
+        """, params)
+        conn.commit()
+        if table == "cached_videos":
+            _refresh_ranking(conn)
+
+
+# ─── PLAYLIST ───
+
+def save_playlist_videos(videos: List[Dict], score_version: str = None):
+    """Upsert playlist rows; removed items are dropped separately by prune_playlist_videos()"""
+    if not videos:
+        print("⚠️ Skipping playlist save: no videos")
+        return
+    rows = list({v["video_id"]: _video_row(v, score_version) + (v.get("position", idx),)
+                 for idx, v in enumerate(videos)}.values())
+    with _conn() as conn:
+        c = conn.cursor()
+        _copy_upsert(c, "playlist_videos", VIDEO_COLUMNS + ("position",), rows, ("video_id",))
+        conn.commit()
     print(f"💾 Cached {len(videos)} playlist videos")
 
 
+def get_playlist_index() -> Dict[str, Dict]:
+    """video_id -> fields the incremental playlist refresh diffs against"""
+    with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        c.execute("SELECT video_id, artist, song, posted, position FROM playlist_videos")
+        rows = c.fetchall()
+    return {r["video_id"]: r for r in rows}
+
+
+def update_playlist_rows(changes: List[tuple]):
+    """changes: (video_id, position, posted) for rows already in playlist_videos"""
+    with _conn() as conn:
+        c = conn.cursor()
+        c.executemany("UPDATE playlist_videos SET position = %s, posted = %s WHERE video_id = %s",
+                      [(pos, posted, vid) for vid, pos, posted in changes])
+        conn.commit()
+
+
+def prune_playlist_videos(keep_ids: List[str]) -> int:
+    """Delete rows for items no longer in the playlist"""
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("DELETE FROM playlist_videos WHERE NOT (video_id = ANY(%s))", (keep_ids,))
+        removed = c.rowcount
+        conn.commit()
+    return removed
+
+
 def get_playlist_videos(hide_posted: bool = True) -> List[Dict]:
-    conn = _conn()
-    c = conn.cursor(row_factory=dict_row)
-    query = "SELECT * FROM playlist_videos"
-    if hide_posted:
-        query += " WHERE posted = FALSE"
-    query += " ORDER BY score_total DESC"
-    c.execute(query)
-    rows = c.fetchall()
-    conn.close()
-    return [
-        {
-            "video_id": r["video_id"], "url": r["url"], "title": r["title"],
-            "artist": r["artist"], "song": r["song"], "channel": r["channel"],
-            "year": r["year"], "published": r["published"], "duration": r["duration"],
-            "views": r["views"], "hd": bool(r["hd"]), "thumbnail": r["thumbnail"],
-            "score": {
-                "total": r["score_total"], "fixed": r.get("score_fixed", 0),
-                "guia": r.get("score_guia", 0),
-                "artist_match": r["artist_match"], "song_match": r["song_match"]
-            },
-            "posted": bool(r["posted"]), "position": r["position"]
-        }
-        for r in rows
-    ]
+    with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        query = "SELECT * FROM playlist_videos"
+        if hide_posted:
+            query += " WHERE posted = FALSE"
+        query += " ORDER BY score_total DESC"
+        c.execute(query)
+        rows = c.fetchall()
+    return [_video_row_to_dict(r) for r in rows]
+
+
+# ─── CONFIG & SEED CACHE ───
+# system_config and category_seeds are tiny and read on most requests, so each
+# process keeps both in memory (loaded together in one round trip). Writers
+# NOTIFY KV_CHANNEL in the same transaction; every worker's listener thread
+# then drops its copy. While the listener is not connected the cache is
+# bypassed, since a missed notification could leave it stale.
+KV_CHANNEL = "opera_kv"
+
+_kv = None           # {"config": {...}, "seeds": {...}} once loaded
+_kv_epoch = 0        # bumped on every invalidation, so a load racing one is discarded
+_kv_listening = False
+_kv_lock = threading.Lock()
+_kv_stop = threading.Event()
+
+
+def _kv_invalidate():
+    global _kv, _kv_epoch
+    with _kv_lock:
+        _kv = None
+        _kv_epoch += 1
+
+
+def _kv_snapshot() -> Optional[Dict]:
+    """Cached config + seeds, loading them if needed; None when the cache can't be trusted"""
+    global _kv
+    if not _kv_listening:
+        return None
+    with _kv_lock:
+        if _kv is not None:
+            return _kv
+        epoch = _kv_epoch
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("SELECT key, value FROM system_config")
+        config = dict(c.fetchall())
+        c.execute("SELECT category_id, last_seed FROM category_seeds")
+        seeds = dict(c.fetchall())
+    kv = {"config": config, "seeds": seeds}
+    with _kv_lock:
+        if epoch == _kv_epoch and _kv_listening:
+            _kv = kv
+    return kv
+
+
+def kv_cache_active() -> bool:
+    return _kv_listening
+
+
+def peek_seeds() -> Optional[Dict[str, int]]:
+    """Cached seeds without touching the DB (for the async module); None if not loaded"""
+    kv = _kv
+    return kv["seeds"] if kv is not None and _kv_listening else None
+
+
+def _kv_notify(c, what: str):
+    c.execute("SELECT pg_notify(%s, %s)", (KV_CHANNEL, what))
+
+
+def _kv_listen():
+    global _kv_listening
+    backoff = 1
+    while not _kv_stop.is_set():
+        try:
+            with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+                conn.execute(f"LISTEN {KV_CHANNEL}")
+                conn.execute(f"LISTEN {PROJECT_CHANNEL}")
+                _kv_invalidate()  # anything loaded before LISTEN may have missed a change
+                _kv_listening = True
+                backoff = 1
+                while not _kv_stop.is_set():
+                    for n in conn.notifies(timeout=5):
+                        if n.channel == PROJECT_CHANNEL:
+                            _on_project_notify(n.payload)
+                        else:
+                            _kv_invalidate()
+                    conn.execute("SELECT 1")  # a silently dropped connection would never deliver again
+        except Exception as e:
+            print(f"⚠️ Notify listener error: {e}")
+        finally:
+            _kv_listening = False
+            _kv_invalidate()
+        _kv_stop.wait(backoff)
+        backoff = min(backoff * 2, 60)
+
+
+def start_kv_listener():
+    _kv_stop.clear()
+    threading.Thread(target=_kv_listen, name="kv-listener", daemon=True).start()
+
+
+def stop_kv_listener():
+    _kv_stop.set()
+
+
+# ─── PROJECT CHANGE EVENTS ───
+# Every production_projects writer NOTIFYs PROJECT_CHANNEL in its transaction
+# and then calls the in-process subscribers directly. The listener thread
+# above forwards other workers' notifications to the same subscribers (our
+# own are skipped by origin, since they were already delivered).
+PROJECT_CHANNEL = "opera_project"
+PROCESS_ID = os.urandom(6).hex()
+
+_project_subscribers = []
+
+
+def on_project_change(callback):
+    """callback(project_id) on every write to a production project, from any worker (may run in any thread)"""
+    _project_subscribers.append(callback)
+
+
+def _project_payload(project_id: int) -> str:
+    return json.dumps({"id": project_id, "origin": PROCESS_ID})
+
+
+def _notify_project(c, project_id: int):
+    c.execute("SELECT pg_notify(%s, %s)", (PROJECT_CHANNEL, _project_payload(project_id)))
+
+
+def _publish_project(project_id: int):
+    for callback in _project_subscribers:
+        try:
+            callback(project_id)
+        except Exception as e:
+            print(f"⚠️ Project event subscriber error: {e}")
+
+
+def _on_project_notify(payload: str):
+    try:
+        msg = json.loads(payload)
+    except json.JSONDecodeError:
+        return
+    if msg.get("origin") != PROCESS_ID:
+        _publish_project(msg["id"])
 
 
 # ─── CONFIG ───
 
 def set_config(key: str, value: str):
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO system_config (key, value, updated_at)
-        VALUES (%s, %s, CURRENT_TIMESTAMP)
-        ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = CURRENT_TIMESTAMP
-    """, (key, value))
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO system_config (key, value, updated_at)
+            VALUES (%s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = CURRENT_TIMESTAMP
+        """, (key, value))
+        _kv_notify(c, f"config:{key}")
+        conn.commit()
+    _kv_invalidate()
 
 
 def get_config(key: str) -> Optional[str]:
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("SELECT value FROM system_config WHERE key = %s", (key,))
-    row = c.fetchone()
-    conn.close()
+    kv = _kv_snapshot()
+    if kv is not None:
+        return kv["config"].get(key)
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("SELECT value FROM system_config WHERE key = %s", (key,))
+        row = c.fetchone()
     return row[0] if row else None
 
 
 # ─── CACHE STATUS ───
 
 def get_cache_status() -> Dict:
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("""
-        SELECT category, COUNT(*) as count, MAX(fetched_at) as last_update
-        FROM cached_videos GROUP BY category
-    """)
-    categories = {}
-    for row in c.fetchall():
-        categories[row[0]] = {"count": row[1], "last_update": row[2].isoformat() if row[2] else None}
-    c.execute("SELECT COUNT(*) FROM playlist_videos")
-    playlist_count = c.fetchone()[0]
-    c.execute("SELECT MAX(fetched_at) FROM playlist_videos")
-    prow = c.fetchone()
-    playlist_update = prow[0].isoformat() if prow and prow[0] else None
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT category, COUNT(*) as count, MAX(fetched_at) as last_update
+            FROM live_cached_videos GROUP BY category
+        """)
+        categories = {}
+        for row in c.fetchall():
+            categories[row[0]] = {"count": row[1], "last_update": row[2].isoformat() if row[2] else None}
+        c.execute("SELECT COUNT(*) FROM playlist_videos")
+        playlist_count = c.fetchone()[0]
+        c.execute("SELECT MAX(fetched_at) FROM playlist_videos")
+        prow = c.fetchone()
+        playlist_update = prow[0].isoformat() if prow and prow[0] else None
     return {
         "categories": categories,
         "playlist": {"count": playlist_count, "last_update": playlist_update},
@@ -354,31 +889,88 @@ def get_cache_status() -> Dict:
 
 
 def is_cache_empty() -> bool:
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("SELECT COUNT(*) FROM cached_videos")
-    count = c.fetchone()[0]
-    conn.close()
-    return count == 0
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("SELECT EXISTS (SELECT 1 FROM live_cached_videos)")
+        exists = c.fetchone()[0]
+    return not exists
+
+
+# ─── REFRESH RUNS ───
+
+def start_refresh_run(kind: str) -> int:
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("INSERT INTO refresh_runs (kind) VALUES (%s) RETURNING id", (kind,))
+        run_id = c.fetchone()[0]
+        conn.commit()
+    return run_id
+
+
+def finish_refresh_run(run_id: int, status: str, details: Dict):
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            UPDATE refresh_runs SET status = %s, details = %s, finished_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (status, json.dumps(details), run_id))
+        conn.commit()
+
+
+def get_refresh_runs(limit: int = 20) -> List[Dict]:
+    with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        c.execute("SELECT * FROM refresh_runs ORDER BY id DESC LIMIT %s", (limit,))
+        rows = c.fetchall()
+    return [
+        {"id": r["id"], "kind": r["kind"], "status": r["status"],
+         "details": _parse_json_field(r["details"]),
+         "started_at": r["started_at"].isoformat() if r["started_at"] else None,
+         "finished_at": r["finished_at"].isoformat() if r["finished_at"] else None}
+        for r in rows
+    ]
+
+
+# ─── JOB LEASES ───
+
+def try_acquire_lease(name: str, holder: str, ttl_seconds: int) -> bool:
+    """Take (or renew) the named lease unless another holder's lease is still valid"""
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO job_leases (name, holder, expires_at)
+            VALUES (%s, %s, CURRENT_TIMESTAMP + make_interval(secs => %s))
+            ON CONFLICT (name) DO UPDATE SET holder = EXCLUDED.holder, expires_at = EXCLUDED.expires_at
+            WHERE job_leases.expires_at < CURRENT_TIMESTAMP OR job_leases.holder = EXCLUDED.holder
+            RETURNING name
+        """, (name, holder, ttl_seconds))
+        acquired = c.fetchone() is not None
+        conn.commit()
+    return acquired
+
+
+def release_lease(name: str, holder: str):
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("DELETE FROM job_leases WHERE name = %s AND holder = %s", (name, holder))
+        conn.commit()
 
 
 # ─── DOWNLOADS ───
 
 def save_download(video_id: str, filename: str, artist: str, song: str, youtube_url: str):
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("INSERT INTO downloads (video_id, filename, artist, song, youtube_url) VALUES (%s,%s,%s,%s,%s)",
-              (video_id, filename, artist, song, youtube_url))
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("INSERT INTO downloads (video_id, filename, artist, song, youtube_url) VALUES (%s,%s,%s,%s,%s)",
+                  (video_id, filename, artist, song, youtube_url))
+        conn.commit()
 
 
 def get_downloads() -> List[Dict]:
-    conn = _conn()
-    c = conn.cursor(row_factory=dict_row)
-    c.execute("SELECT * FROM downloads ORDER BY downloaded_at DESC")
-    rows = c.fetchall()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        c.execute("SELECT * FROM downloads ORDER BY downloaded_at DESC")
+        rows = c.fetchall()
     return [
         {"id": r["id"], "video_id": r["video_id"], "filename": r["filename"],
          "artist": r["artist"], "song": r["song"], "youtube_url": r["youtube_url"],
@@ -400,53 +992,266 @@ def export_downloads_csv() -> str:
 # ─── V7: SEED ROTATION ───
 
 def get_last_seed(category_id: str) -> int:
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("SELECT last_seed FROM category_seeds WHERE category_id = %s", (category_id,))
-    row = c.fetchone()
-    conn.close()
+    kv = _kv_snapshot()
+    if kv is not None:
+        return kv["seeds"].get(category_id, 0)
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("SELECT last_seed FROM category_seeds WHERE category_id = %s", (category_id,))
+        row = c.fetchone()
     return row[0] if row else 0
 
 
+def get_last_seeds() -> Dict[str, int]:
+    """category_id -> last_seed for every category in one query"""
+    kv = _kv_snapshot()
+    if kv is not None:
+        return dict(kv["seeds"])
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("SELECT category_id, last_seed FROM category_seeds")
+        rows = c.fetchall()
+    return {r[0]: r[1] for r in rows}
+
+
 def save_last_seed(category_id: str, seed_index: int):
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO category_seeds (category_id, last_seed, updated_at)
-        VALUES (%s, %s, CURRENT_TIMESTAMP)
-        ON CONFLICT (category_id) DO UPDATE SET
-            last_seed = EXCLUDED.last_seed, updated_at = CURRENT_TIMESTAMP
-    """, (category_id, seed_index))
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO category_seeds (category_id, last_seed, updated_at)
+            VALUES (%s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (category_id) DO UPDATE SET
+                last_seed = EXCLUDED.last_seed, updated_at = CURRENT_TIMESTAMP
+        """, (category_id, seed_index))
+        _kv_notify(c, f"seed:{category_id}")
+        conn.commit()
+    _kv_invalidate()
+
+
+# ─── POSTED REGISTRY ───
+
+def save_posted_entries(entries: List[Dict], source: str = "api") -> List[Dict]:
+    """Insert posted entries (artist, song, artist_norm, song_norm); returns the rows actually added"""
+    if not entries:
+        return []
+    with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        c.execute("""
+            INSERT INTO posted_registry (artist, song, artist_norm, song_norm, source)
+            SELECT a, s, an, sn, %s
+            FROM unnest(%s::text[], %s::text[], %s::text[], %s::text[]) AS t(a, s, an, sn)
+            ON CONFLICT (artist_norm, song_norm) DO NOTHING
+            RETURNING id, artist, song, artist_norm, song_norm
+        """, (
+            source,
+            [e["artist"] for e in entries], [e.get("song") or "" for e in entries],
+            [e["artist_norm"] for e in entries], [e.get("song_norm") or "" for e in entries],
+        ))
+        rows = c.fetchall()
+        conn.commit()
+    return rows
+
+
+def get_posted_entries(since: datetime = None, overlap_seconds: int = 0) -> tuple:
+    """(rows, db_now): posted entries added after since - overlap_seconds (all if since is None).
+
+    SERIAL ids and added_at are both taken when an insert starts, not when it
+    commits, so a plain high-water mark can skip a slower concurrent insert.
+    Callers pass the db_now of their previous read and re-scan a trailing
+    window; rows seen twice are deduplicated by the caller.
+    """
+    with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        if since is None:
+            c.execute("SELECT id, artist, song, artist_norm, song_norm FROM posted_registry ORDER BY id")
+        else:
+            c.execute("""
+                SELECT id, artist, song, artist_norm, song_norm FROM posted_registry
+                WHERE added_at > %s - make_interval(secs => %s) ORDER BY id
+            """, (since, overlap_seconds))
+        rows = c.fetchall()
+        now = conn.execute("SELECT LOCALTIMESTAMP").fetchone()[0]
+    return rows, now
+
+
+# ─── SEARCH RESULT CACHE ───
+
+def get_search_cache(cache_key: str, ttl_seconds: int) -> Optional[List[Dict]]:
+    """Cached results for cache_key if younger than ttl_seconds (bumps hit stats)"""
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            UPDATE search_cache SET hits = hits + 1, last_hit_at = CURRENT_TIMESTAMP
+            WHERE cache_key = %s AND created_at > CURRENT_TIMESTAMP - make_interval(secs => %s)
+            RETURNING results
+        """, (cache_key, ttl_seconds))
+        row = c.fetchone()
+        conn.commit()
+    return _parse_json_field(row[0]) if row else None
+
+
+def save_search_cache(cache_key: str, query: str, max_results: int, results: List[Dict],
+                      keep_seconds: int, max_entries: int):
+    """Store results, then drop rows older than keep_seconds and evict least recently hit beyond max_entries"""
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO search_cache (cache_key, query, max_results, results, hits, created_at, last_hit_at)
+            VALUES (%s, %s, %s, %s, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            ON CONFLICT (cache_key) DO UPDATE SET
+                results = EXCLUDED.results, hits = 0,
+                created_at = CURRENT_TIMESTAMP, last_hit_at = CURRENT_TIMESTAMP
+        """, (cache_key, query, max_results, json.dumps(results)))
+        c.execute("DELETE FROM search_cache WHERE created_at <= CURRENT_TIMESTAMP - make_interval(secs => %s)",
+                  (keep_seconds,))
+        c.execute("""
+            DELETE FROM search_cache WHERE cache_key IN (
+                SELECT cache_key FROM search_cache ORDER BY last_hit_at DESC OFFSET %s
+            )
+        """, (max_entries,))
+        conn.commit()
+
+
+def get_search_cache_status() -> Dict:
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("SELECT COUNT(*), COALESCE(SUM(hits), 0), MIN(created_at) FROM search_cache")
+        count, hits, oldest = c.fetchone()
+    return {"entries": count, "hits": hits, "oldest": oldest.isoformat() if oldest else None}
+
+
+# ─── VIDEO DETAILS CACHE ───
+
+def get_video_details(video_ids: List[str], max_age_seconds: int) -> Dict[str, Dict]:
+    """videos.list items still fresh (younger than max_age_seconds), keyed by video_id"""
+    if not video_ids:
+        return {}
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT video_id, details FROM video_details
+            WHERE video_id = ANY(%s) AND fetched_at > CURRENT_TIMESTAMP - make_interval(secs => %s)
+        """, (list(video_ids), max_age_seconds))
+        rows = c.fetchall()
+    return {r[0]: _parse_json_field(r[1]) for r in rows}
+
+
+def save_video_details(items: List[Dict]):
+    items = list({it["id"]: it for it in items}.values())
+    if not items:
+        return
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO video_details (video_id, details, fetched_at)
+            SELECT id, d, CURRENT_TIMESTAMP FROM unnest(%s::text[], %s::text[]) AS t(id, d)
+            ON CONFLICT (video_id) DO UPDATE SET details = EXCLUDED.details, fetched_at = CURRENT_TIMESTAMP
+        """, ([it["id"] for it in items], [json.dumps(it) for it in items]))
+        conn.commit()
+
+
+# ─── V7: SEED PREFETCH ───
+
+def save_prefetched_seed(category_id: str, seed_index: int, seed_query: str, videos: List[Dict]):
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO category_prefetch (category_id, seed_index, seed_query, videos, fetched_at)
+            VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (category_id) DO UPDATE SET
+                seed_index = EXCLUDED.seed_index, seed_query = EXCLUDED.seed_query,
+                videos = EXCLUDED.videos, fetched_at = CURRENT_TIMESTAMP
+        """, (category_id, seed_index, seed_query, json.dumps(videos)))
+        conn.commit()
+
+
+def has_prefetched_seed(category_id: str, seed_index: int, max_age_seconds: int) -> bool:
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT 1 FROM category_prefetch
+            WHERE category_id = %s AND seed_index = %s
+              AND fetched_at > CURRENT_TIMESTAMP - make_interval(secs => %s)
+        """, (category_id, seed_index, max_age_seconds))
+        found = c.fetchone() is not None
+    return found
+
+
+def take_prefetched_seed(category_id: str, seed_index: int, max_age_seconds: int) -> Optional[List[Dict]]:
+    """Claim the staged videos for this seed (deleted on read, so only one refresh uses them)"""
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            DELETE FROM category_prefetch
+            WHERE category_id = %s AND seed_index = %s
+              AND fetched_at > CURRENT_TIMESTAMP - make_interval(secs => %s)
+            RETURNING videos
+        """, (category_id, seed_index, max_age_seconds))
+        row = c.fetchone()
+        conn.commit()
+    return _parse_json_field(row[0]) if row else None
+
+
+def get_prefetch_status() -> Dict:
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("SELECT category_id, seed_index, fetched_at FROM category_prefetch")
+        rows = c.fetchall()
+    return {r[0]: {"seed_index": r[1], "fetched_at": r[2].isoformat() if r[2] else None} for r in rows}
 
 
 # ─── V7: QUOTA TRACKING ───
 
-def register_quota_usage(search_calls: int = 0, detail_calls: int = 0):
+def register_quota_usage(search_calls: int = 0, detail_calls: int = 0,
+                         cache_hits: int = 0, cache_misses: int = 0, usage_date: date = None):
+    today = usage_date or date.today()
+    points = search_calls * 100 + detail_calls * 1
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO quota_usage (usage_date, search_calls, detail_calls, total_points, cache_hits, cache_misses)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (usage_date) DO UPDATE SET
+                search_calls = quota_usage.search_calls + EXCLUDED.search_calls,
+                detail_calls = quota_usage.detail_calls + EXCLUDED.detail_calls,
+                total_points = quota_usage.total_points + EXCLUDED.total_points,
+                cache_hits = quota_usage.cache_hits + EXCLUDED.cache_hits,
+                cache_misses = quota_usage.cache_misses + EXCLUDED.cache_misses
+        """, (today, search_calls, detail_calls, points, cache_hits, cache_misses))
+        conn.commit()
+
+
+def reserve_quota(search_calls: int, detail_calls: int, ceiling: int) -> bool:
+    """Charge today's quota up front, only if total_points stays <= ceiling (atomic across workers)"""
     today = date.today()
     points = search_calls * 100 + detail_calls * 1
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO quota_usage (usage_date, search_calls, detail_calls, total_points)
-        VALUES (%s, %s, %s, %s)
-        ON CONFLICT (usage_date) DO UPDATE SET
-            search_calls = quota_usage.search_calls + EXCLUDED.search_calls,
-            detail_calls = quota_usage.detail_calls + EXCLUDED.detail_calls,
-            total_points = quota_usage.total_points + EXCLUDED.total_points
-    """, (today, search_calls, detail_calls, points))
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO quota_usage (usage_date, search_calls, detail_calls, total_points)
+            SELECT %s, %s, %s, %s WHERE %s <= %s
+            ON CONFLICT (usage_date) DO UPDATE SET
+                search_calls = quota_usage.search_calls + EXCLUDED.search_calls,
+                detail_calls = quota_usage.detail_calls + EXCLUDED.detail_calls,
+                total_points = quota_usage.total_points + EXCLUDED.total_points
+            WHERE quota_usage.total_points + EXCLUDED.total_points <= %s
+            RETURNING total_points
+        """, (today, search_calls, detail_calls, points, points, ceiling, ceiling))
+        ok = c.fetchone() is not None
+        conn.commit()
+    return ok
 
 
 def get_quota_status() -> Dict:
     today = date.today()
-    conn = _conn()
-    c = conn.cursor(row_factory=dict_row)
-    c.execute("SELECT * FROM quota_usage WHERE usage_date = %s", (today,))
-    row = c.fetchone()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        c.execute("SELECT * FROM quota_usage WHERE usage_date = %s", (today,))
+        row = c.fetchone()
+    return _quota_row_to_dict(row, today)
+
+
+def _quota_row_to_dict(row: Optional[Dict], today: date) -> Dict:
     if row:
         return {
             "date": str(row["usage_date"]),
@@ -455,11 +1260,14 @@ def get_quota_status() -> Dict:
             "total_points": row["total_points"],
             "limit": 10000,
             "remaining": max(0, 10000 - row["total_points"]),
+            "cache_hits": row.get("cache_hits") or 0,
+            "cache_misses": row.get("cache_misses") or 0,
         }
     return {
         "date": str(today),
         "search_calls": 0, "detail_calls": 0, "total_points": 0,
         "limit": 10000, "remaining": 10000,
+        "cache_hits": 0, "cache_misses": 0,
     }
 
 
@@ -477,7 +1285,8 @@ def _parse_json_field(val):
 
 
 def _prod_row_to_dict(r: Dict) -> Dict:
-    return {
+    # JSONB columns arrive decoded from psycopg; they are passed through as stored
+    d = {
         "id": r["id"],
         "artist": r["artist"],
         "song": r["song"],
@@ -489,13 +1298,13 @@ def _prod_row_to_dict(r: Dict) -> Dict:
         "duration": r.get("duration"),
         "status": r.get("status", "uploaded"),
         "transcription": r.get("transcription"),
-        "transcription_segments": _parse_json_field(r.get("transcription_segments")),
-        "overlay_subtitles": _parse_json_field(r.get("overlay_subtitles")),
+        "transcription_segments": r.get("transcription_segments"),
+        "overlay_subtitles": r.get("overlay_subtitles"),
         "post_text": r.get("post_text"),
-        "youtube_seo": _parse_json_field(r.get("youtube_seo")),
+        "youtube_seo": r.get("youtube_seo"),
         "overlay_approved": bool(r.get("overlay_approved")),
         "post_approved": bool(r.get("post_approved")),
-        "translations": _parse_json_field(r.get("translations")),
+        "translations": r.get("translations"),
         "output_path": r.get("output_path"),
         "created_at": r["created_at"].isoformat() if r.get("created_at") else None,
         "updated_at": r["updated_at"].isoformat() if r.get("updated_at") else None,
@@ -503,37 +1312,63 @@ def _prod_row_to_dict(r: Dict) -> Dict:
         "official_lyrics": r.get("official_lyrics"),
         "language": r.get("language", "en"),
     }
+    if "translation_langs" in r:
+        d["translation_langs"] = r["translation_langs"]
+    return d
 
 
 def create_production_project(artist: str, song: str, hook: str = None,
                               cut_start: float = 0, cut_end: float = None,
                               video_filename: str = None, video_path: str = None,
                               duration: float = None, language: str = "en") -> int:
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO production_projects
-        (artist, song, hook, cut_start, cut_end, video_filename, video_path, duration, language)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING id
-    """, (artist, song, hook, cut_start, cut_end, video_filename, video_path, duration, language))
-    pid = c.fetchone()[0]
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO production_projects
+            (artist, song, hook, cut_start, cut_end, video_filename, video_path, duration, language)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+        """, (artist, song, hook, cut_start, cut_end, video_filename, video_path, duration, language))
+        pid = c.fetchone()[0]
+        _notify_project(c, pid)
+        conn.commit()
+    _publish_project(pid)
     return pid
 
 
-def get_production_projects() -> List[Dict]:
-    conn = _conn()
-    c = conn.cursor(row_factory=dict_row)
-    c.execute("""
+def _prod_list_query(limit: int = None, after: tuple = None, status: str = None) -> tuple:
+    """Newest-first project summaries; after=(created_at, id) of the last row already seen"""
+    where, params = [], []
+    if status:
+        where.append("status = %s")
+        params.append(status)
+    if after:
+        where.append("(created_at, id) < (%s, %s)")
+        params += list(after)
+    query = """
         SELECT id, artist, song, status, video_filename, duration,
                overlay_approved, post_approved, created_at, updated_at, error_message
-        FROM production_projects ORDER BY created_at DESC
-    """)
-    rows = c.fetchall()
-    conn.close()
-    return [{
+        FROM production_projects"""
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += " ORDER BY created_at DESC, id DESC"
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+    return query, params
+
+
+def get_production_projects(limit: int = None, after: tuple = None, status: str = None) -> List[Dict]:
+    query, params = _prod_list_query(limit, after, status)
+    with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        c.execute(query, params)
+        rows = c.fetchall()
+    return [_prod_summary_to_dict(r) for r in rows]
+
+
+def _prod_summary_to_dict(r) -> Dict:
+    return {
         "id": r["id"], "artist": r["artist"], "song": r["song"],
         "status": r["status"], "video_filename": r.get("video_filename"),
         "duration": r.get("duration"),
@@ -542,124 +1377,227 @@ def get_production_projects() -> List[Dict]:
         "created_at": r["created_at"].isoformat() if r.get("created_at") else None,
         "updated_at": r["updated_at"].isoformat() if r.get("updated_at") else None,
         "error_message": r.get("error_message"),
-    } for r in rows]
+    }
+
+
+PROD_STATUS_QUERY = """
+    SELECT id, status, overlay_approved, post_approved, error_message
+    FROM production_projects WHERE id = %s
+"""
+
+
+def get_production_status(project_id: int) -> Optional[Dict]:
+    """Just the fields status polling needs (served from idx_prod_status_cover)"""
+    with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        c.execute(PROD_STATUS_QUERY, (project_id,))
+        row = c.fetchone()
+    return _prod_status_to_dict(row) if row else None
+
+
+def _prod_status_to_dict(r) -> Dict:
+    return {
+        "id": r["id"], "status": r["status"],
+        "overlay_approved": bool(r["overlay_approved"]),
+        "post_approved": bool(r["post_approved"]),
+        "error_message": r["error_message"],
+    }
+
+
+# translations may hold a legacy non-object value; treat it as "no languages"
+PROD_LANGS_EXPR = """CASE WHEN jsonb_typeof(translations) = 'object'
+    THEN ARRAY(SELECT jsonb_object_keys(translations)) ELSE '{}'::text[] END"""
 
+# Detail view: everything but the translations payload, which is fetched per language
+PROD_DETAIL_QUERY = f"""
+    SELECT id, artist, song, hook, cut_start, cut_end, video_filename, video_path, duration, status,
+           transcription, transcription_segments, overlay_subtitles, post_text, youtube_seo,
+           overlay_approved, post_approved, output_path, created_at, updated_at,
+           error_message, official_lyrics, language, {PROD_LANGS_EXPR} AS translation_langs
+    FROM production_projects WHERE id = %s
+"""
 
-def get_production_project(project_id: int) -> Optional[Dict]:
-    conn = _conn()
-    c = conn.cursor(row_factory=dict_row)
-    c.execute("SELECT * FROM production_projects WHERE id = %s", (project_id,))
-    row = c.fetchone()
-    conn.close()
+
+def _prod_project_query(with_translations: bool) -> str:
+    return "SELECT * FROM production_projects WHERE id = %s" if with_translations else PROD_DETAIL_QUERY
+
+
+def get_production_project(project_id: int, with_translations: bool = True) -> Optional[Dict]:
+    with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        c.execute(_prod_project_query(with_translations), (project_id,))
+        row = c.fetchone()
     if not row:
         return None
     return _prod_row_to_dict(row)
 
 
 def update_production_status(project_id: int, status: str, error_message: str = None):
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("""
-        UPDATE production_projects
-        SET status = %s, error_message = %s, updated_at = CURRENT_TIMESTAMP
-        WHERE id = %s
-    """, (status, error_message, project_id))
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            UPDATE production_projects
+            SET status = %s, error_message = %s, updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (status, error_message, project_id))
+        _notify_project(c, project_id)
+        conn.commit()
+    _publish_project(project_id)
 
 
 def update_production_transcription(project_id: int, transcription: str, segments: list = None):
-    conn = _conn()
-    c = conn.cursor()
-    seg_json = json.dumps(segments) if segments else None
-    c.execute("""
-        UPDATE production_projects
-        SET transcription = %s, transcription_segments = %s,
-            status = 'transcribed', updated_at = CURRENT_TIMESTAMP
-        WHERE id = %s
-    """, (transcription, seg_json, project_id))
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        seg_json = Jsonb(segments) if segments else None
+        c.execute("""
+            UPDATE production_projects
+            SET transcription = %s, transcription_segments = %s,
+                status = 'transcribed', updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (transcription, seg_json, project_id))
+        _notify_project(c, project_id)
+        conn.commit()
+    _publish_project(project_id)
 
 
 def update_production_content(project_id: int, overlay: list, post_text: str, seo: dict):
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("""
-        UPDATE production_projects
-        SET overlay_subtitles = %s, post_text = %s, youtube_seo = %s,
-            status = 'generated', updated_at = CURRENT_TIMESTAMP
-        WHERE id = %s
-    """, (json.dumps(overlay), post_text, json.dumps(seo), project_id))
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            UPDATE production_projects
+            SET overlay_subtitles = %s, post_text = %s, youtube_seo = %s,
+                status = 'generated', updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (Jsonb(overlay), post_text, Jsonb(seo), project_id))
+        _notify_project(c, project_id)
+        conn.commit()
+    _publish_project(project_id)
+
+
+def update_production_seo(project_id: int, seo: dict):
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            UPDATE production_projects SET youtube_seo = %s, updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (Jsonb(seo), project_id))
+        _notify_project(c, project_id)
+        conn.commit()
+    _publish_project(project_id)
 
 
 def update_production_overlay(project_id: int, overlay: list, approved: bool):
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("""
-        UPDATE production_projects
-        SET overlay_subtitles = %s, overlay_approved = %s, updated_at = CURRENT_TIMESTAMP
-        WHERE id = %s
-    """, (json.dumps(overlay), approved, project_id))
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            UPDATE production_projects
+            SET overlay_subtitles = %s, overlay_approved = %s, updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (Jsonb(overlay), approved, project_id))
+        _notify_project(c, project_id)
+        conn.commit()
+    _publish_project(project_id)
 
 
 def update_production_post(project_id: int, post_text: str, approved: bool):
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("""
-        UPDATE production_projects
-        SET post_text = %s, post_approved = %s, updated_at = CURRENT_TIMESTAMP
-        WHERE id = %s
-    """, (post_text, approved, project_id))
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            UPDATE production_projects
+            SET post_text = %s, post_approved = %s, updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (post_text, approved, project_id))
+        _notify_project(c, project_id)
+        conn.commit()
+    _publish_project(project_id)
 
 
 def update_production_translations(project_id: int, translations: dict):
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("""
-        UPDATE production_projects
-        SET translations = %s, status = 'translated', updated_at = CURRENT_TIMESTAMP
-        WHERE id = %s
-    """, (json.dumps(translations), project_id))
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            UPDATE production_projects
+            SET translations = %s, status = 'translated', updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (Jsonb(translations), project_id))
+        _notify_project(c, project_id)
+        conn.commit()
+    _publish_project(project_id)
+
+
+def update_production_translation(project_id: int, lang: str, data: dict):
+    """Merge data into one language of translations; other languages are neither sent nor touched"""
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            UPDATE production_projects
+            SET translations = jsonb_set(
+                    CASE WHEN jsonb_typeof(translations) = 'object' THEN translations ELSE '{}'::jsonb END,
+                    ARRAY[%s],
+                    CASE WHEN jsonb_typeof(translations -> %s) = 'object'
+                         THEN translations -> %s ELSE '{}'::jsonb END || %s),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (lang, lang, lang, Jsonb(data), project_id))
+        updated = c.rowcount > 0
+        _notify_project(c, project_id)
+        conn.commit()
+    _publish_project(project_id)
+    return updated
+
+
+def get_production_translation(project_id: int, lang: str) -> Optional[Dict]:
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT CASE WHEN jsonb_typeof(translations) = 'object' THEN translations -> %s END
+            FROM production_projects WHERE id = %s
+        """, (lang, project_id))
+        row = c.fetchone()
+    return row[0] if row else None
+
+
+def get_production_translation_langs(project_id: int) -> Optional[List[str]]:
+    """Languages present in translations (None if the project doesn't exist)"""
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute(f"SELECT {PROD_LANGS_EXPR} FROM production_projects WHERE id = %s", (project_id,))
+        row = c.fetchone()
+    return row[0] if row else None
 
 
 def update_production_output(project_id: int, output_path: str):
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("""
-        UPDATE production_projects
-        SET output_path = %s, status = 'completed', updated_at = CURRENT_TIMESTAMP
-        WHERE id = %s
-    """, (output_path, project_id))
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            UPDATE production_projects
+            SET output_path = %s, status = 'completed', updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (output_path, project_id))
+        _notify_project(c, project_id)
+        conn.commit()
+    _publish_project(project_id)
 
 
 def update_production_official_lyrics(project_id: int, official_lyrics: str):
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("""
-        UPDATE production_projects
-        SET official_lyrics = %s, updated_at = CURRENT_TIMESTAMP
-        WHERE id = %s
-    """, (official_lyrics, project_id))
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("""
+            UPDATE production_projects
+            SET official_lyrics = %s, updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (official_lyrics, project_id))
+        _notify_project(c, project_id)
+        conn.commit()
+    _publish_project(project_id)
 
 
 def delete_production_project(project_id: int) -> bool:
-    conn = _conn()
-    c = conn.cursor()
-    c.execute("DELETE FROM production_projects WHERE id = %s", (project_id,))
-    deleted = c.rowcount > 0
-    conn.commit()
-    conn.close()
+    with _conn() as conn:
+        c = conn.cursor()
+        c.execute("DELETE FROM production_projects WHERE id = %s", (project_id,))
+        deleted = c.rowcount > 0
+        _notify_project(c, project_id)
+        conn.commit()
+    _publish_project(project_id)
     return deleted
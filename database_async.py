@@ -0,0 +1,199 @@
+# ══════════════════════════════════════════════════════════════
+# DATABASE MODULE V7 — async face for request handlers
+# Same function names as database.py. Hot-path queries run on psycopg's
+# AsyncConnectionPool; anything not defined here falls through to the
+# database.py function, run in a worker thread, so the event loop never blocks.
+# ══════════════════════════════════════════════════════════════
+
+import asyncio, functools
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import List, Dict, Optional
+
+import psycopg
+from psycopg.rows import dict_row
+
+import database as db
+
+try:
+    from psycopg_pool import AsyncConnectionPool
+except ImportError:
+    AsyncConnectionPool = None
+
+pool = None
+
+
+async def open_pool():
+    global pool
+    if AsyncConnectionPool is None:
+        print("⚠️ psycopg_pool not installed — async queries open one connection each")
+        return
+    pool = AsyncConnectionPool(
+        db.DATABASE_URL, min_size=db.DB_ASYNC_POOL_MIN, max_size=db.DB_ASYNC_POOL_MAX, timeout=db.DB_POOL_TIMEOUT,
+        max_idle=db.DB_POOL_MAX_IDLE, max_lifetime=db.DB_POOL_MAX_LIFETIME,
+        check=AsyncConnectionPool.check_connection, name="opera-async", open=False,
+    )
+    await pool.open(wait=True, timeout=db.DB_POOL_TIMEOUT)
+    print(f"✅ PostgreSQL async pool open ({db.DB_ASYNC_POOL_MIN}-{db.DB_ASYNC_POOL_MAX} connections)")
+
+
+async def close_pool():
+    global pool
+    if pool is not None:
+        await pool.close()
+        pool = None
+
+
+def get_pool_stats() -> Dict:
+    if pool is None:
+        return {"pooled": False}
+    return {"pooled": True, **pool.get_stats()}
+
+
+@asynccontextmanager
+async def _conn():
+    if pool is not None:
+        async with pool.connection() as conn:
+            yield conn
+        return
+    async with await psycopg.AsyncConnection.connect(db.DATABASE_URL) as conn:
+        yield conn
+
+
+def __getattr__(name):
+    # database.py functions without a native version here: same call, off the event loop
+    fn = getattr(db, name)
+    if name.startswith("_") or not callable(fn):
+        raise AttributeError(name)
+
+    @functools.wraps(fn)
+    async def run(*args, **kwargs):
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    return run
+
+
+# ─── CACHE & SEEDS ───
+
+async def get_cached_videos(category: str, hide_posted: bool = True) -> List[Dict]:
+    query = "SELECT * FROM live_cached_videos WHERE category = %s"
+    if hide_posted:
+        query += " AND posted = FALSE"
+    query += " ORDER BY score_total DESC"
+    async with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        await c.execute(query, (category,))
+        rows = await c.fetchall()
+    return [db._video_row_to_dict(r) for r in rows]
+
+
+async def get_ranking_videos(hide_posted: bool = True, limit: int = 60) -> tuple:
+    async with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        await c.execute(db._ranking_query(hide_posted), (limit,))
+        rows = await c.fetchall()
+        hidden = (await (await conn.execute(db.RANKING_HIDDEN_QUERY)).fetchone())[0] if hide_posted else 0
+    return [db._video_row_to_dict(r) for r in rows], hidden
+
+
+async def get_last_seed(category_id: str) -> int:
+    seeds = db.peek_seeds()
+    if seeds is None and db.kv_cache_active():
+        seeds = await asyncio.to_thread(db.get_last_seeds)  # loads the cache for the next reads
+    if seeds is not None:
+        return seeds.get(category_id, 0)
+    async with _conn() as conn:
+        c = conn.cursor()
+        await c.execute("SELECT last_seed FROM category_seeds WHERE category_id = %s", (category_id,))
+        row = await c.fetchone()
+    return row[0] if row else 0
+
+
+async def get_last_seeds() -> Dict[str, int]:
+    seeds = db.peek_seeds()
+    if seeds is None and db.kv_cache_active():
+        seeds = await asyncio.to_thread(db.get_last_seeds)  # loads the cache for the next reads
+    if seeds is not None:
+        return dict(seeds)
+    async with _conn() as conn:
+        c = conn.cursor()
+        await c.execute("SELECT category_id, last_seed FROM category_seeds")
+        rows = await c.fetchall()
+    return {r[0]: r[1] for r in rows}
+
+
+async def get_quota_status() -> Dict:
+    today = date.today()
+    async with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        await c.execute("SELECT * FROM quota_usage WHERE usage_date = %s", (today,))
+        row = await c.fetchone()
+    return db._quota_row_to_dict(row, today)
+
+
+# ─── PRODUCTION PROJECTS ───
+
+async def _notify_project(conn, project_id: int):
+    await conn.execute("SELECT pg_notify(%s, %s)", (db.PROJECT_CHANNEL, db._project_payload(project_id)))
+
+
+async def create_production_project(artist: str, song: str, hook: str = None,
+                                    cut_start: float = 0, cut_end: float = None,
+                                    video_filename: str = None, video_path: str = None,
+                                    duration: float = None, language: str = "en") -> int:
+    async with _conn() as conn:
+        c = conn.cursor()
+        await c.execute("""
+            INSERT INTO production_projects
+            (artist, song, hook, cut_start, cut_end, video_filename, video_path, duration, language)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+        """, (artist, song, hook, cut_start, cut_end, video_filename, video_path, duration, language))
+        pid = (await c.fetchone())[0]
+        await _notify_project(conn, pid)
+    db._publish_project(pid)
+    return pid
+
+
+async def get_production_projects(limit: int = None, after: tuple = None, status: str = None) -> List[Dict]:
+    query, params = db._prod_list_query(limit, after, status)
+    async with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        await c.execute(query, params)
+        rows = await c.fetchall()
+    return [db._prod_summary_to_dict(r) for r in rows]
+
+
+async def get_production_status(project_id: int) -> Optional[Dict]:
+    async with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        await c.execute(db.PROD_STATUS_QUERY, (project_id,))
+        row = await c.fetchone()
+    return db._prod_status_to_dict(row) if row else None
+
+
+async def get_production_project(project_id: int, with_translations: bool = True) -> Optional[Dict]:
+    async with _conn() as conn:
+        c = conn.cursor(row_factory=dict_row)
+        await c.execute(db._prod_project_query(with_translations), (project_id,))
+        row = await c.fetchone()
+    return db._prod_row_to_dict(row) if row else None
+
+
+async def update_production_status(project_id: int, status: str, error_message: str = None):
+    async with _conn() as conn:
+        await conn.execute("""
+            UPDATE production_projects
+            SET status = %s, error_message = %s, updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (status, error_message, project_id))
+        await _notify_project(conn, project_id)
+    db._publish_project(project_id)
+
+
+async def delete_production_project(project_id: int) -> bool:
+    async with _conn() as conn:
+        c = await conn.execute("DELETE FROM production_projects WHERE id = %s", (project_id,))
+        deleted = c.rowcount > 0
+        await _notify_project(conn, project_id)
+    db._publish_project(project_id)
+    return deleted
@@ -3,8 +3,8 @@
 # Seed Rotation · V7 Scoring · Anti-Spam · Quota Control
 # ══════════════════════════════════════════════════════════════
 
-import os, re, csv, json, unicodedata, asyncio, tempfile, subprocess, shutil, zipfile
-from datetime import datetime
+import os, re, csv, json, time, random, socket, hashlib, unicodedata, asyncio, tempfile, subprocess, shutil, zipfile
+from datetime import datetime, date
 from pathlib import Path
 from typing import Optional
 from contextlib import asynccontextmanager
@@ -16,6 +16,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, StreamingResponse, Response
 
 import database as db
+import database_async as adb
 
 # ─── CONFIG ───
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY", "")
@@ -23,6 +24,41 @@ DATASET_PATH = Path(os.getenv("DATASET_PATH", "./dataset_v3_categorizado.csv"))
 STATIC_PATH = Path(os.getenv("STATIC_PATH", "./static"))
 PLAYLIST_ID = "PLGjiuPqoIDSnphyXIetV6iwm4-3K-fvKk"
 APP_PASSWORD = os.getenv("APP_PASSWORD", "opera2026")
+POSTED_SYNC_INTERVAL = int(os.getenv("POSTED_SYNC_INTERVAL", "60"))  # seconds between registry syncs
+POSTED_SYNC_OVERLAP = int(os.getenv("POSTED_SYNC_OVERLAP", "300"))    # seconds of registry re-scanned on each sync
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "1800"))        # seconds a live search result is reused
+SEARCH_CACHE_MAX = int(os.getenv("SEARCH_CACHE_MAX", "500"))         # entries kept before LRU eviction
+VIDEO_DETAILS_TTL = int(os.getenv("VIDEO_DETAILS_TTL", "21600"))    # seconds videos.list data stays fresh
+REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", "3"))     # categories fetched in parallel on refresh
+
+# ─── REFRESH SCHEDULER CONFIG (stale-while-revalidate) ───
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "1") == "1"
+SCHEDULER_INTERVAL = int(os.getenv("SCHEDULER_INTERVAL", "900"))                   # seconds between checks
+CATEGORY_SOFT_TTL = int(os.getenv("CATEGORY_SOFT_TTL_DAYS", "30")) * 86400          # monthly category refresh
+PLAYLIST_SOFT_TTL = int(os.getenv("PLAYLIST_SOFT_TTL_DAYS", "7")) * 86400           # weekly playlist refresh
+REFRESH_JITTER = int(os.getenv("REFRESH_JITTER_HOURS", "12")) * 3600                # spreads refreshes apart
+REFRESH_RETRY_BACKOFF = int(os.getenv("REFRESH_RETRY_HOURS", "6")) * 3600           # wait after a failed/empty refresh
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+PLAYLIST_MAX_PAGES = int(os.getenv("PLAYLIST_MAX_PAGES", "40"))  # 50 items per page
+
+# ─── SEED PREFETCH CONFIG ───
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "0") == "1"
+PREFETCH_MAX_AGE = int(os.getenv("PREFETCH_MAX_AGE", "259200"))    # staged results older than this are refetched
+PREFETCH_IDLE_SECONDS = int(os.getenv("PREFETCH_IDLE_SECONDS", "30"))  # no user request for this long = idle
+PREFETCH_LEASE_TTL = 300                                              # seconds one worker may hold a category's prefetch
+
+# ─── QUOTA BUDGET (YouTube Data API: 10,000 points/day) ───
+QUOTA_DAILY_LIMIT = 10000
+QUOTA_CLASSES = {
+    # priority: (max share of the daily limit the day's total may reach, paced over the day)
+    "interactive": (1.0, False),
+    "scheduled": (float(os.getenv("QUOTA_SHARE_SCHEDULED", "0.6")), True),
+    "prefetch": (float(os.getenv("QUOTA_SHARE_PREFETCH", "0.3")), True),
+}
+QUOTA_BURST = float(os.getenv("QUOTA_BURST", "0.25"))  # share of a paced class available at midnight
+SEARCH_CACHE_KEEP = int(os.getenv("SEARCH_CACHE_KEEP", "604800"))  # expired results kept for cache-only mode
+QUOTA_FLUSH_INTERVAL = int(os.getenv("QUOTA_FLUSH_INTERVAL", "10"))  # seconds between quota_usage write-backs
 
 # ─── PRODUCTION MODULE CONFIG ───
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "").strip()
@@ -38,6 +74,12 @@ try:
 except ImportError:
     FFMPEG_BIN = shutil.which("ffmpeg") or "ffmpeg"
 
+# Aho-Corasick automaton for V7 keyword scoring (optional, falls back to regex)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # ffprobe lives next to ffmpeg in imageio-ffmpeg
 _ffmpeg_dir = os.path.dirname(FFMPEG_BIN)
 _ffprobe_candidate = os.path.join(_ffmpeg_dir, "ffprobe")
@@ -184,6 +226,7 @@ CATEGORY_SPECIALTY = {
 
 # ─── POSTED REGISTRY ───
 posted_registry = set()
+POSTED_STOP = {"","the","and","de","di","la","le","el","a","o","in","of"}
 
 def normalize_str(s: str) -> str:
     s = s.lower().strip()
@@ -192,57 +235,340 @@ def normalize_str(s: str) -> str:
     s = re.sub(r"[^a-z0-9\s]", "", s)
     return re.sub(r"\s+", " ", s).strip()
 
+def _trigrams(s: str) -> set:
+    return {s[i:i+3] for i in range(len(s) - 2)}
+
+def _side_match(q: str, qw: set, r: str, rw: set) -> bool:
+    return len(qw & rw) >= min(2, len(qw)) or r in q or q in r
+
+
+class PostedIndex:
+    """Inverted index over the posted registry.
+
+    Match rules are the same as the original linear scan: exact (artist, song)
+    pair, or artist AND song each matching by shared words (>= min(2, words))
+    or substring. Each side keeps word postings, trigram postings (query is a
+    substring of the entry) and a rarest-trigram anchor (entry is a substring
+    of the query), so a lookup only verifies entries reachable from those keys.
+    """
+
+    def __init__(self):
+        self.entries = []            # (ra, rs, artist_words, song_words)
+        self.exact = set()
+        self.words = ({}, {})        # side -> word -> entry ids
+        self.grams = ({}, {})        # side -> trigram -> entry ids
+        self.anchors = ({}, {})      # side -> rarest trigram -> entry ids
+        self.short = ([], [])        # side -> ids whose text is < 3 chars
+
+    @classmethod
+    def build(cls, pairs) -> "PostedIndex":
+        idx = cls()
+        for ra, rs in pairs:
+            idx._insert(ra, rs)
+        # Anchors are chosen once all trigram postings exist so each entry
+        # hangs off its globally rarest trigram.
+        for i, (ra, rs, rw, rsw) in enumerate(idx.entries):
+            if rw and rsw:
+                idx._anchor(0, i, ra)
+                idx._anchor(1, i, rs)
+        return idx
+
+    def add(self, ra: str, rs: str):
+        if (ra, rs) in self.exact:
+            return
+        i = self._insert(ra, rs)
+        _, _, rw, rsw = self.entries[i]
+        if rw and rsw:
+            self._anchor(0, i, ra)
+            self._anchor(1, i, rs)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _insert(self, ra: str, rs: str) -> int:
+        i = len(self.entries)
+        rw = set(ra.split()) - POSTED_STOP
+        rsw = set(rs.split()) - POSTED_STOP
+        self.entries.append((ra, rs, rw, rsw))
+        self.exact.add((ra, rs))
+        # Entries without words on both sides can only ever match exactly.
+        if rw and rsw:
+            for side, text, words in ((0, ra, rw), (1, rs, rsw)):
+                for w in words:
+                    self.words[side].setdefault(w, set()).add(i)
+                for g in _trigrams(text):
+                    self.grams[side].setdefault(g, set()).add(i)
+        return i
+
+    def _anchor(self, side: int, i: int, text: str):
+        grams = _trigrams(text)
+        if not grams:
+            self.short[side].append(i)
+            return
+        g = min(grams, key=lambda g: len(self.grams[side][g]))
+        self.anchors[side].setdefault(g, set()).add(i)
+
+    def _candidates(self, side: int, q: str, qw: set) -> set:
+        cands = set()
+        for w in qw:
+            cands |= self.words[side].get(w, set())
+        grams = _trigrams(q)
+        # entry text inside the query: its anchor trigram must occur in q
+        for g in grams:
+            cands |= self.anchors[side].get(g, set())
+        cands.update(self.short[side])
+        # query inside the entry text: every query trigram occurs in the entry
+        if grams:
+            postings = sorted((self.grams[side].get(g, set()) for g in grams), key=len)
+            cands |= set.intersection(*postings)
+        else:
+            for ps in self.words[side].values():
+                cands |= ps
+        return cands
+
+    def match(self, na: str, ns: str, _memo: dict = None) -> bool:
+        if not na and not ns: return False
+        if (na, ns) in self.exact: return True
+        aw = set(na.split()) - POSTED_STOP
+        sw = set(ns.split()) - POSTED_STOP
+        if not aw or not sw: return False
+        if _memo is None:
+            cands = self._candidates(0, na, aw)
+            if not cands: return False
+            cands = cands & self._candidates(1, ns, sw)
+        else:
+            # Batch mode: candidate sets are shared by every pair with the same artist/song
+            ca = _memo.get((0, na))
+            if ca is None: ca = _memo[(0, na)] = self._candidates(0, na, aw)
+            if not ca: return False
+            cs = _memo.get((1, ns))
+            if cs is None: cs = _memo[(1, ns)] = self._candidates(1, ns, sw)
+            cands = ca & cs
+        for i in cands:
+            ra, rs, rw, rsw = self.entries[i]
+            if _side_match(na, aw, ra, rw) and _side_match(ns, sw, rs, rsw):
+                return True
+        return False
+
+    def match_many(self, pairs) -> list:
+        memo, seen = {}, {}
+        out = []
+        for na, ns in pairs:
+            hit = seen.get((na, ns))
+            if hit is None:
+                hit = seen[(na, ns)] = self.match(na, ns, memo)
+            out.append(hit)
+        return out
+
+
+posted_index = PostedIndex()
+posted_sync_id = 0     # highest registry id applied (informational)
+posted_sync_at = None  # DB clock at the last registry read; the next sync re-scans from here - overlap
+
 def is_posted(artist: str, song: str) -> bool:
-    na, ns = normalize_str(artist), normalize_str(song)
-    if not na and not ns: return False
-    stop = {"","the","and","de","di","la","le","el","a","o","in","of"}
-    for ra, rs in posted_registry:
-        if ra == na and rs == ns: return True
-        aw = set(na.split()) - stop; rw = set(ra.split()) - stop
-        am = (len(aw&rw) >= min(2,len(aw)) or ra in na or na in ra) if aw and rw else False
-        sw = set(ns.split()) - stop; rsw = set(rs.split()) - stop
-        sm = (len(sw&rsw) >= min(2,len(sw)) or rs in ns or ns in rs) if sw and rsw else False
-        if am and sm: return True
-    return False
+    return posted_index.match(normalize_str(artist), normalize_str(song))
+
+def is_posted_many(pairs) -> list:
+    """Batch is_posted(): one bool per (artist, song), each distinct string normalized once"""
+    norm = {}
+    def _n(s):
+        s = s or ""
+        r = norm.get(s)
+        if r is None: r = norm[s] = normalize_str(s)
+        return r
+    return posted_index.match_many([(_n(a), _n(s)) for a, s in pairs])
+
+def _read_posted_csv() -> list:
+    entries = []
+    with open(DATASET_PATH, encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            a = row.get("Nome do Cantor","").strip()
+            s = (row.get("Nome da Música") or row.get("Nome da Musica") or "").strip()
+            if a: entries.append({"artist": a, "song": s,
+                                  "artist_norm": normalize_str(a), "song_norm": normalize_str(s)})
+    return entries
+
+def import_posted_csv():
+    """Seed the posted_registry table from DATASET_PATH, once per CSV content"""
+    if not DATASET_PATH.exists(): return
+    sig = hashlib.sha1(DATASET_PATH.read_bytes()).hexdigest()
+    if db.get_config("posted_csv_sha1") == sig: return
+    added = db.save_posted_entries(_read_posted_csv(), source="csv")
+    db.set_config("posted_csv_sha1", sig)
+    print(f"📥 Posted registry: imported {len(added)} new entries from {DATASET_PATH.name}")
+
+def _apply_posted_rows(rows) -> int:
+    """Add rows not seen yet (the sync window overlaps); returns how many were new"""
+    global posted_sync_id
+    added = 0
+    for r in rows:
+        pair = (r["artist_norm"], r["song_norm"] or "")
+        if pair not in posted_registry:
+            posted_registry.add(pair)
+            posted_index.add(*pair)
+            added += 1
+        posted_sync_id = max(posted_sync_id, r["id"])
+    return added
 
 def load_posted():
-    global posted_registry; posted_registry = set()
-    if DATASET_PATH.exists():
-        with open(DATASET_PATH, encoding="utf-8") as f:
-            for row in csv.DictReader(f):
-                a = row.get("Nome do Cantor","").strip()
-                s = row.get("Nome da Musica","").strip()
-                if a: posted_registry.add((normalize_str(a), normalize_str(s)))
-        print(f"✅ Posted registry: {len(posted_registry)} entries")
+    """Full load of the registry (startup). Later changes arrive via sync_posted()"""
+    global posted_registry, posted_index, posted_sync_id, posted_sync_at
+    try:
+        import_posted_csv()
+        rows, posted_sync_at = db.get_posted_entries()
+    except Exception as e:
+        print(f"⚠️ Posted registry DB load failed, using CSV only: {e}")
+        rows = [{"id": 0, **e} for e in _read_posted_csv()] if DATASET_PATH.exists() else []
+        posted_sync_at = None
+    posted_registry = {(r["artist_norm"], r["song_norm"] or "") for r in rows}
+    posted_index = PostedIndex.build(posted_registry)
+    posted_sync_id = max((r["id"] for r in rows), default=0)
+    print(f"✅ Posted registry: {len(posted_registry)} entries")
+
+async def sync_posted() -> int:
+    """Pull rows added since the last sync (by any worker) into the in-process index"""
+    global posted_sync_at
+    # Rows are applied on the event loop so lookups never see a half-updated index.
+    rows, now = await asyncio.to_thread(db.get_posted_entries, posted_sync_at, POSTED_SYNC_OVERLAP)
+    added = _apply_posted_rows(rows)
+    posted_sync_at = now
+    return added
+
+async def posted_sync_loop():
+    while True:
+        await asyncio.sleep(POSTED_SYNC_INTERVAL)
+        try:
+            n = await sync_posted()
+            if n: print(f"🔄 Posted registry: +{n} entries (total {len(posted_registry)})")
+        except Exception as e:
+            print(f"⚠️ Posted registry sync error: {e}")
 
 
 # ─── SCORING V7 ───
+class KeywordMatcher:
+    """All V7 keyword rules compiled into one multi-pattern matcher.
+
+    Each rule is a keyword list (priority order) plus the video fields it looks
+    at. match() lowercases those fields, walks them in a single pass and returns
+    rule -> winning keyword, with the same result as the old per-list loops: the
+    earliest keyword in list order found as a substring of any of its fields.
+    Uses a pyahocorasick automaton when installed, otherwise a trie-shaped regex.
+    """
+
+    def __init__(self, rules: dict):
+        # rules: name -> (keywords, fields)
+        self.fields = []
+        for _, fields in rules.values():
+            for f in fields:
+                if f not in self.fields: self.fields.append(f)
+        self.targets = {}                        # lowercase keyword -> [(rule, rank, original, field mask)]
+        for rule, (words, fields) in rules.items():
+            mask = sum(1 << self.fields.index(f) for f in fields)
+            seen = set()
+            for i, w in enumerate(words):
+                k = w.lower()
+                if k in seen: continue
+                seen.add(k)
+                self.targets.setdefault(k, []).append((rule, i, w, mask))
+        keywords = sorted(self.targets)
+        # The regex reports the longest keyword starting at each position; any
+        # shorter keyword starting there is necessarily one of its prefixes.
+        self.prefixes = {k: [p for p in keywords if k.startswith(p)] for k in keywords}
+        self.pattern = re.compile("(?=(" + self._trie_regex(keywords) + "))")
+        self.automaton = None
+        if ahocorasick:
+            self.automaton = ahocorasick.Automaton()
+            for k in keywords:
+                self.automaton.add_word(k, (len(k) - 1, self.targets[k]))
+            self.automaton.make_automaton()
+
+    @classmethod
+    def _trie_regex(cls, words) -> str:
+        trie = {}
+        for w in words:
+            node = trie
+            for ch in w:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        return cls._node_regex(trie)
+
+    @classmethod
+    def _node_regex(cls, node) -> str:
+        alts = [re.escape(ch) + cls._node_regex(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:
+            return "(?:" + body + ")?"
+        return body
+
+    def _hits(self, text: str):
+        if self.automaton is not None:
+            for end, (span, targets) in self.automaton.iter(text):
+                yield end - span, targets
+        else:
+            for m in self.pattern.finditer(text):
+                for k in self.prefixes[m.group(1)]:
+                    yield m.start(), self.targets[k]
+
+    def match(self, v: dict) -> dict:
+        # Fields are joined with "\n" (never part of a keyword), so no hit can
+        # span two fields; each hit is attributed to a field by its offset.
+        parts = [(v.get(f) or "").lower() for f in self.fields]
+        best = {}
+        text = "\n".join(parts)
+        if len(text) < len(parts):
+            return best
+        ends, pos = [], -1
+        for p in parts:
+            pos += len(p) + 1
+            ends.append(pos)
+        for start, targets in self._hits(text):
+            fi = 0
+            while start > ends[fi]: fi += 1
+            bit = 1 << fi
+            for rule, rank, word, mask in targets:
+                if mask & bit:
+                    cur = best.get(rule)
+                    if cur is None or rank < cur[0]:
+                        best[rule] = (rank, word)
+        return {rule: word for rule, (_, word) in best.items()}
+
+
+def build_v7_matcher() -> KeywordMatcher:
+    rules = {
+        "elite": (ELITE_HITS, ("song", "title")),
+        "power": (POWER_NAMES, ("artist", "channel", "title")),
+        "voice": (VOICE_KEYWORDS, ("title",)),
+        "institutional": (INSTITUTIONAL_CHANNELS, ("channel",)),
+    }
+    for cat, kws in CATEGORY_SPECIALTY.items():
+        rules[f"specialty:{cat}"] = (kws, ("title", "channel"))
+    return KeywordMatcher(rules)
+
+V7_MATCHER = build_v7_matcher()
+
+# Bump SCORE_RULES_REV when calc_score_v7's logic (not its keyword lists) changes.
+# Stored scores with another version are rescored in one background pass.
+SCORE_RULES_REV = 1
+SCORE_RULES_VERSION = hashlib.sha1(json.dumps([
+    SCORE_RULES_REV, ELITE_HITS, POWER_NAMES, VOICE_KEYWORDS, INSTITUTIONAL_CHANNELS, CATEGORY_SPECIALTY,
+], sort_keys=True).encode()).hexdigest()[:12]
+
+
 def calc_score_v7(v: dict, category: str = None) -> dict:
     reasons = []
     total = 0
-    title_low = (v.get("title") or "").lower()
-    artist_low = (v.get("artist") or "").lower()
-    song_low = (v.get("song") or "").lower()
-    channel_low = (v.get("channel") or "").lower()
+    hits = V7_MATCHER.match(v)
 
     # 1. elite_hits +15
-    hit_match = None
-    for hit in ELITE_HITS:
-        hl = hit.lower()
-        if hl in song_low or hl in title_low:
-            hit_match = hit
-            break
+    hit_match = hits.get("elite")
     if hit_match:
         total += 15
         reasons.append({"tag": "elite_hit", "label": hit_match, "points": 15})
 
     # 2. power_names +15
-    name_match = None
-    for name in POWER_NAMES:
-        nl = name.lower()
-        if nl in artist_low or nl in channel_low or nl in title_low:
-            name_match = name
-            break
+    name_match = hits.get("power")
     if name_match:
         total += 15
         reasons.append({"tag": "power_name", "label": name_match, "points": 15})
@@ -252,30 +578,19 @@ def calc_score_v7(v: dict, category: str = None) -> dict:
     if hit_match and name_match:
         specialty_match = f"{name_match} + {hit_match}"
     elif category and category in CATEGORY_SPECIALTY:
-        for kw in CATEGORY_SPECIALTY[category]:
-            if kw in title_low or kw in channel_low:
-                specialty_match = kw
-                break
+        specialty_match = hits.get(f"specialty:{category}")
     if specialty_match:
         total += 25
         reasons.append({"tag": "specialty", "label": specialty_match, "points": 25})
 
     # 4. voice +15
-    voice_match = None
-    for kw in VOICE_KEYWORDS:
-        if kw in title_low:
-            voice_match = kw
-            break
+    voice_match = hits.get("voice")
     if voice_match:
         total += 15
         reasons.append({"tag": "voice", "label": voice_match, "points": 15})
 
     # 5. institutional +10
-    inst_match = None
-    for ch in INSTITUTIONAL_CHANNELS:
-        if ch in channel_low:
-            inst_match = v.get("channel", "")
-            break
+    inst_match = v.get("channel", "") if "institutional" in hits else None
     if inst_match:
         total += 10
         reasons.append({"tag": "institutional", "label": inst_match, "points": 10})
@@ -320,10 +635,202 @@ def extract_artist_song(title: str) -> tuple:
     return clean, ""
 
 
+# ─── HTTP CLIENTS (one pooled client per upstream, app lifetime) ───
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "1") == "1"
+try:
+    import h2  # noqa: F401 — httpx needs it for http2=True
+except ImportError:
+    HTTP2_ENABLED = False
+
+UPSTREAMS = {
+    # name: (read timeout s, max connections, max keep-alive connections)
+    "youtube":   (15, 20, 10),
+    "openai":    (300, 4, 2),
+    "anthropic": (120, 4, 2),
+    "translate": (60, 10, 5),
+}
+http_clients: dict = {}
+http_stats = {name: {"requests": 0, "errors": 0} for name in UPSTREAMS}
+
+
+def _make_client(name: str) -> httpx.AsyncClient:
+    read_timeout, max_conn, max_keepalive = UPSTREAMS[name]
+    stats = http_stats[name]
+
+    async def _on_request(request):
+        stats["requests"] += 1
+
+    async def _on_response(response):
+        if response.status_code >= 400:
+            stats["errors"] += 1
+
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(read_timeout, connect=10),
+        limits=httpx.Limits(max_connections=max_conn, max_keepalive_connections=max_keepalive,
+                            keepalive_expiry=60),
+        http2=HTTP2_ENABLED,
+        event_hooks={"request": [_on_request], "response": [_on_response]},
+    )
+
+
+def open_http_clients():
+    for name in UPSTREAMS:
+        if name not in http_clients:
+            http_clients[name] = _make_client(name)
+
+
+async def close_http_clients():
+    for name in list(http_clients):
+        await http_clients.pop(name).aclose()
+
+
+@asynccontextmanager
+async def upstream(name: str):
+    """Shared pooled client for an upstream; leaving the block keeps it open"""
+    client = http_clients.get(name)
+    if client is None or client.is_closed:
+        client = http_clients[name] = _make_client(name)
+    yield client
+
+
+def http_pool_stats() -> dict:
+    out = {}
+    for name in UPSTREAMS:
+        client = http_clients.get(name)
+        # httpx has no public pool API; read httpcore's pool defensively
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        conns = list(getattr(pool, "connections", []) or [])
+        out[name] = {
+            **http_stats[name],
+            "open": client is not None and not client.is_closed,
+            "connections": len(conns),
+            "idle": sum(1 for c in conns if c.is_idle()),
+            "http2": HTTP2_ENABLED,
+            "max_connections": UPSTREAMS[name][1],
+        }
+    return out
+
+
+# ─── QUOTA BUDGETER ───
+# Points are reserved in quota_usage *before* each call. Every priority class
+# has a ceiling on the day's total: lower classes stop early so interactive
+# searches always keep headroom, and paced classes earn their ceiling linearly
+# through the day (a token bucket refilled from midnight, burst QUOTA_BURST).
+
+class QuotaExhausted(Exception):
+    """The priority class has no budget left; callers fall back to cached data"""
+
+
+def quota_ceiling(priority: str, now: datetime = None) -> int:
+    share, paced = QUOTA_CLASSES[priority]
+    cap = share * QUOTA_DAILY_LIMIT
+    if paced:
+        now = now or datetime.now()
+        elapsed = (now - now.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds() / 86400
+        cap *= min(1.0, QUOTA_BURST + elapsed)
+    return int(cap)
+
+
+async def quota_reserve(priority: str, search_calls: int = 0, detail_calls: int = 0):
+    """Reserve points for a call or raise QuotaExhausted"""
+    if not search_calls:
+        # videos.list / playlistItems cost 1 point: checked against the in-memory
+        # snapshot and written behind. Workers can overshoot a ceiling by at most
+        # what they spend within one flush interval.
+        if quota_counters.status()["total_points"] + detail_calls > quota_ceiling(priority):
+            print(f"⛔ Quota budget for '{priority}' exhausted (ceiling {quota_ceiling(priority)})")
+            raise QuotaExhausted(priority)
+        quota_counters.add(detail_calls=detail_calls)
+        return
+    # search.list is 100 points (at most 100 a day): keep the atomic cross-worker reservation
+    try:
+        ok = await asyncio.to_thread(db.reserve_quota, search_calls, detail_calls, quota_ceiling(priority))
+    except Exception as e:
+        # Tracking problems must not take search down: fail open, like the old after-the-fact logging
+        print(f"⚠️ Quota tracking error: {e}")
+        return
+    if ok:
+        quota_counters.charged(search_calls, detail_calls)
+    else:
+        print(f"⛔ Quota budget for '{priority}' exhausted (ceiling {quota_ceiling(priority)})")
+        raise QuotaExhausted(priority)
+
+
+class QuotaCounters:
+    """Per-process quota counters, written behind to quota_usage.
+
+    Increments accumulate in memory and are flushed in one upsert per day
+    every QUOTA_FLUSH_INTERVAL seconds (and at shutdown). status() is the
+    quota_usage row read at the last flush, so it includes other workers'
+    usage, plus what this process has not flushed yet.
+    """
+    FIELDS = ("search_calls", "detail_calls", "cache_hits", "cache_misses")
+
+    def __init__(self):
+        self.pending = {}     # date -> {field: count}
+        self.snapshot = None  # db.get_quota_status() as of the last flush
+
+    def add(self, **counts):
+        day = self.pending.setdefault(date.today(), dict.fromkeys(self.FIELDS, 0))
+        for field, n in counts.items():
+            day[field] += n
+
+    def charged(self, search_calls: int, detail_calls: int):
+        """Points already written to the DB by reserve_quota(): reflect them in the snapshot"""
+        snap = self.snapshot
+        if snap and snap["date"] == str(date.today()):
+            points = search_calls * 100 + detail_calls
+            snap.update(search_calls=snap["search_calls"] + search_calls,
+                        detail_calls=snap["detail_calls"] + detail_calls,
+                        total_points=snap["total_points"] + points,
+                        remaining=max(0, snap["remaining"] - points))
+
+    def status(self) -> dict:
+        today = date.today()
+        snap = self.snapshot if self.snapshot and self.snapshot["date"] == str(today) else db._quota_row_to_dict(None, today)
+        p = self.pending.get(today)
+        if not p:
+            return dict(snap)
+        points = p["search_calls"] * 100 + p["detail_calls"]
+        return {**snap, **{f: snap[f] + p[f] for f in self.FIELDS},
+                "total_points": snap["total_points"] + points,
+                "remaining": max(0, snap["remaining"] - points)}
+
+    async def flush(self):
+        pending, self.pending = self.pending, {}
+        try:
+            for day, p in sorted(pending.items()):
+                if any(p.values()):
+                    await asyncio.to_thread(db.register_quota_usage, p["search_calls"], p["detail_calls"],
+                                            p["cache_hits"], p["cache_misses"], day)
+                pending.pop(day)
+            self.snapshot = await asyncio.to_thread(db.get_quota_status)
+        except Exception as e:
+            print(f"⚠️ Quota flush error: {e}")
+            for day, p in pending.items():  # not written: merge back for the next flush
+                for field, n in p.items():
+                    self.pending.setdefault(day, dict.fromkeys(self.FIELDS, 0))[field] += n
+
+
+quota_counters = QuotaCounters()
+
+
+async def quota_flush_loop():
+    while True:
+        await asyncio.sleep(QUOTA_FLUSH_INTERVAL)
+        await quota_counters.flush()
+
+
+def quota_budget() -> dict:
+    return {p: {"ceiling": quota_ceiling(p), "share": QUOTA_CLASSES[p][0], "paced": QUOTA_CLASSES[p][1]}
+            for p in QUOTA_CLASSES}
+
+
 # ─── YOUTUBE API v3 (with anti-spam & quota tracking) ───
-async def yt_search(query: str, max_results: int = 25) -> list:
+async def yt_search(query: str, max_results: int = 25, priority: str = "interactive") -> list:
     if not YOUTUBE_API_KEY: return []
-    async with httpx.AsyncClient(timeout=15) as client:
+    await quota_reserve(priority, search_calls=1)
+    async with upstream("youtube") as client:
         r1 = await client.get("https://www.googleapis.com/youtube/v3/search", params={
             "part": "snippet", "q": query, "type": "video",
             "maxResults": min(max_results, 50),
@@ -338,18 +845,8 @@ async def yt_search(query: str, max_results: int = 25) -> list:
         vids = [it["id"]["videoId"] for it in items if "videoId" in it.get("id", {})]
         if not vids: return []
 
-        r2 = await client.get("https://www.googleapis.com/youtube/v3/videos", params={
-            "part": "contentDetails,statistics", "id": ",".join(vids), "key": YOUTUBE_API_KEY
-        })
-        dm = {}
-        if r2.status_code == 200:
-            for v in r2.json().get("items", []): dm[v["id"]] = v
-
-        # Register quota usage
-        try:
-            db.register_quota_usage(search_calls=1, detail_calls=1)
-        except Exception as e:
-            print(f"⚠️ Quota tracking error: {e}")
+        # videos.list calls are reserved by the batcher
+        dm = await get_video_details(vids, priority)
 
         results = []
         for it in items:
@@ -375,67 +872,277 @@ async def yt_search(query: str, max_results: int = 25) -> list:
         return results
 
 
-async def yt_playlist(playlist_id: str, max_results: int = 50) -> list:
-    if not YOUTUBE_API_KEY: return []
-    async with httpx.AsyncClient(timeout=15) as client:
-        r1 = await client.get("https://www.googleapis.com/youtube/v3/playlistItems", params={
-            "part": "snippet", "playlistId": playlist_id,
-            "maxResults": max_results, "key": YOUTUBE_API_KEY
-        })
-        if r1.status_code != 200:
-            print(f"⚠️ YT playlist error {r1.status_code}: {r1.text[:200]}")
-            return []
-        items = r1.json().get("items", [])
-        if not items: return []
+def _priority_rank(priority: str) -> int:
+    return list(QUOTA_CLASSES).index(priority)  # QUOTA_CLASSES lists the most important class first
+
+
+class VideoDetailsBatcher:
+    """Merges videos.list lookups from concurrent callers.
+
+    IDs requested within `window` seconds are collected and fetched together
+    in requests of up to 50 IDs; every caller awaits only its own IDs, and an
+    ID already in flight is never requested twice.
+    """
+
+    def __init__(self, window: float = 0.02, max_batch: int = 50):
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = {}            # video_id -> (Future resolving to the videos.list item or None, priority)
+        self.inflight = {}           # video_id -> Future of a batch being fetched right now
+        self.flush_task = None
+
+    async def get(self, video_ids, priority: str = "interactive") -> dict:
+        loop = asyncio.get_running_loop()
+        futs = {}
+        for vid in video_ids:
+            fut = self.inflight.get(vid)
+            if fut is None:
+                fut, queued = self.pending.get(vid, (None, None))
+                if fut is None:
+                    fut = loop.create_future()
+                    self.pending[vid] = (fut, priority)
+                elif _priority_rank(priority) < _priority_rank(queued):
+                    self.pending[vid] = (fut, priority)
+            futs[vid] = fut
+        if self.pending and (self.flush_task is None or self.flush_task.done()):
+            self.flush_task = asyncio.create_task(self._flush_later())
+            self.flush_task.add_done_callback(self._release_orphans)
+        out = {}
+        for vid, fut in futs.items():
+            item = await fut
+            if item: out[vid] = item
+        return out
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        while self.pending:
+            batch = list(self.pending.items())[:self.max_batch]
+            for vid, (fut, _) in batch:
+                del self.pending[vid]
+                self.inflight[vid] = fut
+            await self._run_batch(batch)
+
+    def _release_orphans(self, task):
+        # A cancelled flush (even one that never started) leaves the queue without
+        # a fetcher; unless get() already started a new flush, release the waiters.
+        if task.cancelled() and self.flush_task is task:
+            for fut, _ in self.pending.values():
+                if not fut.done(): fut.set_result(None)
+            self.pending.clear()
+
+    async def _run_batch(self, batch: list):
+        items = {}
+        try:
+            # Charged to the most important class waiting on the batch
+            priority = min((p for _, (_, p) in batch), key=_priority_rank)
+            items = await self._fetch([vid for vid, _ in batch], priority)
+        except Exception as e:
+            print(f"⚠️ YT videos.list error: {e}")
+        finally:
+            for vid, (fut, _) in batch:
+                if not fut.done(): fut.set_result(items.get(vid))
+                self.inflight.pop(vid, None)
+
+    async def _fetch(self, ids: list, priority: str) -> dict:
+        # 1 point per request; over the class ceiling the details are skipped, not the search
+        try:
+            await quota_reserve(priority, detail_calls=1)
+        except QuotaExhausted:
+            return {}
+        async with upstream("youtube") as client:
+            r = await client.get("https://www.googleapis.com/youtube/v3/videos", params={
+                "part": "contentDetails,statistics", "id": ",".join(ids), "key": YOUTUBE_API_KEY
+            })
+        if r.status_code != 200:
+            print(f"⚠️ YT videos error {r.status_code}: {r.text[:200]}")
+            return {}
+        items = r.json().get("items", [])
+        try:
+            await asyncio.to_thread(db.save_video_details, items)
+        except Exception as e:
+            print(f"⚠️ Video details cache write error: {e}")
+        return {it["id"]: it for it in items}
 
-        vids = [it["snippet"]["resourceId"]["videoId"] for it in items]
-        if not vids: return []
 
-        r2 = await client.get("https://www.googleapis.com/youtube/v3/videos", params={
-            "part": "contentDetails,statistics", "id": ",".join(vids), "key": YOUTUBE_API_KEY
-        })
+video_details_batcher = VideoDetailsBatcher()
+
+
+async def get_video_details(video_ids: list, priority: str = "interactive") -> dict:
+    """videos.list items by id: fresh ones from video_details, the rest via the batcher"""
+    ids = list(dict.fromkeys(video_ids))
+    try:
+        dm = await asyncio.to_thread(db.get_video_details, ids, VIDEO_DETAILS_TTL)
+    except Exception as e:
+        print(f"⚠️ Video details cache read error: {e}")
         dm = {}
-        if r2.status_code == 200:
-            for v in r2.json().get("items", []): dm[v["id"]] = v
+    missing = [vid for vid in ids if vid not in dm]
+    if missing:
+        dm.update(await video_details_batcher.get(missing, priority))
+    return dm
+
+
+def search_cache_key(query: str, max_results: int) -> str:
+    norm = re.sub(r"\s+", " ", query.lower()).strip()
+    return hashlib.sha1(f"{norm}|{max_results}".encode()).hexdigest()
+
+
+async def yt_search_cached(query: str, max_results: int = 25) -> tuple:
+    """yt_search() behind the persistent TTL cache. Returns (results, served_from_cache)"""
+    key = search_cache_key(query, max_results)
+    # Identical queries in flight at the same time share one lookup/fetch
+    return await single_flight(("search", key), lambda: _yt_search_cached(key, query, max_results))
 
+
+async def _yt_search_cached(key: str, query: str, max_results: int) -> tuple:
+    try:
+        hit = await asyncio.to_thread(db.get_search_cache, key, SEARCH_CACHE_TTL)
+    except Exception as e:
+        print(f"⚠️ Search cache read error: {e}")
+        hit = None
+    quota_counters.add(cache_hits=int(hit is not None), cache_misses=int(hit is None))
+    if hit is not None:
+        return hit, True
+    try:
+        results = await yt_search(query, max_results)
+    except QuotaExhausted:
+        # Cache-only mode: an expired result beats no result
+        stale = await asyncio.to_thread(db.get_search_cache, key, SEARCH_CACHE_KEEP)
+        return stale or [], True
+    # Empty results usually mean an API error or exhausted quota: don't pin them
+    if results:
         try:
-            db.register_quota_usage(search_calls=0, detail_calls=1)
-        except Exception:
-            pass
+            await asyncio.to_thread(db.save_search_cache, key, query, max_results, results,
+                                    SEARCH_CACHE_KEEP, SEARCH_CACHE_MAX)
+        except Exception as e:
+            print(f"⚠️ Search cache write error: {e}")
+    return results, False
+
+
+def _playlist_item_to_video(it: dict, det: dict) -> dict:
+    sn = it.get("snippet", {})
+    vid = sn["resourceId"]["videoId"]
+    title = sn.get("title", "")
+    pub = sn.get("publishedAt", "")[:10]
+    yr = int(pub[:4]) if pub else 0
+    thumb = sn.get("thumbnails", {}).get("high", {}).get("url", "")
+    dur = parse_iso_dur(det.get("contentDetails", {}).get("duration", ""))
+    defn = det.get("contentDetails", {}).get("definition", "sd")
+    views = int(det.get("statistics", {}).get("viewCount", 0))
+    artist, song = extract_artist_song(title)
+    return {
+        "video_id": vid, "url": f"https://www.youtube.com/watch?v={vid}",
+        "title": title, "artist": artist, "song": song or title,
+        "channel": sn.get("channelTitle", ""), "year": yr, "published": pub,
+        "duration": dur, "views": views, "hd": defn in ("hd", "4k"),
+        "thumbnail": thumb, "category": "Playlist"
+    }
 
-        results = []
-        for it in items:
-            vid = it["snippet"]["resourceId"]["videoId"]
-            sn = it.get("snippet", {})
-            title = sn.get("title", "")
-            pub = sn.get("publishedAt", "")[:10]
-            yr = int(pub[:4]) if pub else 0
-            thumb = sn.get("thumbnails", {}).get("high", {}).get("url", "")
-            det = dm.get(vid, {})
-            dur = parse_iso_dur(det.get("contentDetails", {}).get("duration", ""))
-            defn = det.get("contentDetails", {}).get("definition", "sd")
-            views = int(det.get("statistics", {}).get("viewCount", 0))
-            artist, song = extract_artist_song(title)
-            results.append({
-                "video_id": vid, "url": f"https://www.youtube.com/watch?v={vid}",
-                "title": title, "artist": artist, "song": song or title,
-                "channel": sn.get("channelTitle", ""), "year": yr, "published": pub,
-                "duration": dur, "views": views, "hd": defn in ("hd", "4k"),
-                "thumbnail": thumb, "category": "Playlist"
-            })
-        return results
+
+async def yt_playlist_pages(playlist_id: str, page_etags: dict = None, priority: str = "interactive"):
+    """Walk playlistItems via nextPageToken, yielding (page_token, page) as pages arrive.
+
+    page is {"etag", "next", "ids", "items"}. Pages whose stored ETag still
+    matches come back 304 and are yielded with items=None and the stored ids.
+    The walk stops early on an API error, so the last page yielded then still
+    has a "next" token — callers use that to tell a complete walk apart.
+    """
+    if not YOUTUBE_API_KEY: return
+    page_etags = page_etags or {}
+    token = ""
+    async with upstream("youtube") as client:
+        for _ in range(PLAYLIST_MAX_PAGES):
+            await quota_reserve(priority, detail_calls=1)
+            known = page_etags.get(token)
+            params = {"part": "snippet", "playlistId": playlist_id, "maxResults": 50, "key": YOUTUBE_API_KEY}
+            if token: params["pageToken"] = token
+            r = await client.get("https://www.googleapis.com/youtube/v3/playlistItems", params=params,
+                                 headers={"If-None-Match": known["etag"]} if known else {})
+            if r.status_code == 304:
+                page = {**known, "items": None}
+            elif r.status_code != 200:
+                print(f"⚠️ YT playlist error {r.status_code}: {r.text[:200]}")
+                return
+            else:
+                data = r.json()
+                items = [it for it in data.get("items", [])
+                         if it.get("snippet", {}).get("resourceId", {}).get("videoId")]
+                page = {"etag": data.get("etag"), "next": data.get("nextPageToken"),
+                        "ids": [it["snippet"]["resourceId"]["videoId"] for it in items], "items": items}
+            yield token, page
+            token = page["next"]
+            if not token: return
+
+
+# ─── PROJECT EVENTS (SSE) ───
+# database.py calls project_events.publish(project_id) for every write to a
+# production project, from this worker or (through LISTEN) any other. Each open
+# /events stream holds a one-slot queue per project: a burst of writes collapses
+# into one wake-up, and an idle project costs no DB reads at all.
+
+SSE_KEEPALIVE = int(os.getenv("SSE_KEEPALIVE", "25"))  # seconds between comment pings on idle streams
+
+
+class ProjectEvents:
+    def __init__(self):
+        self.subscribers = {}  # project_id -> set of asyncio.Queue(maxsize=1)
+        self.loop = None
+
+    def subscribe(self, project_id: int) -> asyncio.Queue:
+        q = asyncio.Queue(maxsize=1)
+        self.subscribers.setdefault(project_id, set()).add(q)
+        return q
+
+    def unsubscribe(self, project_id: int, q: asyncio.Queue):
+        queues = self.subscribers.get(project_id)
+        if queues is None: return
+        queues.discard(q)
+        if not queues: del self.subscribers[project_id]
+
+    def publish(self, project_id: int):
+        """Thread-safe: writers run in request handlers, to_thread workers and the listener thread"""
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._dispatch, project_id)
+
+    def _dispatch(self, project_id: int):
+        for q in self.subscribers.get(project_id, ()):
+            if not q.full():
+                q.put_nowait(project_id)
+
+
+project_events = ProjectEvents()
 
 
 # ─── APP ───
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    db.open_pool()
+    await adb.open_pool()
     db.init_db()
+    project_events.loop = asyncio.get_running_loop()
+    db.on_project_change(project_events.publish)
+    db.start_kv_listener()
+    open_http_clients()
     load_posted()
+    posted_sync_task = asyncio.create_task(posted_sync_loop())
+    await quota_counters.flush()
+    quota_flush_task = asyncio.create_task(quota_flush_loop())
+    if db.get_config("score_rules_version") != SCORE_RULES_VERSION:
+        schedule_rescore()
     print(f"{'✅' if YOUTUBE_API_KEY else '⚠️'} YouTube API {'configured' if YOUTUBE_API_KEY else 'NOT SET'}")
     if db.is_cache_empty():
         print("🔄 Cache empty — auto-populating with V7 seeds...")
         asyncio.create_task(populate_initial_cache())
+    scheduler_task = asyncio.create_task(refresh_scheduler_loop()) if SCHEDULER_ENABLED else None
     yield
+    posted_sync_task.cancel()
+    if scheduler_task: scheduler_task.cancel()
+    if _prefetch_task: _prefetch_task.cancel()
+    quota_flush_task.cancel()
+    await quota_counters.flush()
+    await close_http_clients()
+    db.stop_kv_listener()
+    await adb.close_pool()
+    db.close_pool()
 
 app = FastAPI(title="Best of Opera — Motor V7", version="7.0.0", lifespan=lifespan)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
@@ -446,9 +1153,10 @@ def _process_v7(videos, query, hide_posted, category=None):
     scored = []
     for v in videos:
         if category: v["category"] = category
-        sc = calc_score_v7(v, category)
-        p = is_posted(v.get("artist", ""), v.get("song", ""))
-        scored.append({**v, "score": sc, "posted": p})
+        scored.append({**v, "score": calc_score_v7(v, category)})
+    flags = is_posted_many([(v.get("artist", ""), v.get("song", "")) for v in scored])
+    for v, p in zip(scored, flags):
+        v["posted"] = p
     scored.sort(key=lambda x: x["score"]["total"], reverse=True)
     pc = sum(1 for v in scored if v["posted"])
     vis = [v for v in scored if not v["posted"]] if hide_posted else scored
@@ -456,39 +1164,333 @@ def _process_v7(videos, query, hide_posted, category=None):
             "posted_hidden": pc if hide_posted else 0, "videos": vis}
 
 
+def _hide_posted(result: dict, hide_posted: bool) -> dict:
+    """Per-caller view of an unfiltered _process_v7 result"""
+    if not hide_posted:
+        return {**result, "posted_hidden": 0}
+    vis = [v for v in result["videos"] if not v["posted"]]
+    return {**result, "videos": vis, "posted_hidden": len(result["videos"]) - len(vis)}
+
+
+_inflight: dict = {}
+
+async def single_flight(key, fn):
+    """Run fn() once per key at a time; concurrent callers await the same result.
+
+    The shared task is shielded so one caller disconnecting does not cancel
+    the fetch for the others. Per process only (each worker has its own).
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fn())
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _inflight.pop(key, None) if _inflight.get(key) is t else None)
+    return await asyncio.shield(task)
+
+
 def _rescore_cached(videos, category=None):
-    """Recompute V7 scores for cached videos (adds reasons)"""
+    """Recompute V7 scores for cached videos stored under older scoring rules"""
     for v in videos:
-        v["score"] = calc_score_v7(v, category)
+        v["score"] = {**calc_score_v7(v, category), "version": SCORE_RULES_VERSION}
     videos.sort(key=lambda x: x["score"]["total"], reverse=True)
     return videos
 
 
+_rescore_task = None
+
+def schedule_rescore():
+    """Start the bulk rescoring pass unless one is already running in this worker"""
+    global _rescore_task
+    if _rescore_task is None or _rescore_task.done():
+        _rescore_task = asyncio.create_task(rescore_stored_videos())
+
+
+async def rescore_stored_videos():
+    """Background: rescore every stored video whose score_version is not current"""
+    try:
+        for table, category in (("cached_videos", None), ("playlist_videos", "Playlist")):
+            stale = await asyncio.to_thread(db.get_stale_scored_videos, table, SCORE_RULES_VERSION)
+            for v in stale:
+                v["score"] = calc_score_v7(v, category or v.get("category"))
+            await asyncio.to_thread(db.update_video_scores, table, stale, SCORE_RULES_VERSION)
+            if stale:
+                print(f"🔁 Rescored {len(stale)} {table} rows (rules {SCORE_RULES_VERSION})")
+        await asyncio.to_thread(db.set_config, "score_rules_version", SCORE_RULES_VERSION)
+    except Exception as e:
+        print(f"❌ Rescore error: {e}")
+
+
+async def _populate_category(cat_key: str, cat_data: dict) -> dict:
+    t0 = time.monotonic()
+    try:
+        seed_query = cat_data["seeds"][0]
+        full_query = f"{seed_query} {ANTI_SPAM}"
+        raw = await yt_search(full_query, 25, priority="scheduled")
+        if not raw:
+            # yt_search returns [] on upstream errors: keep the previous generation
+            print(f"⚠️ No results for {cat_key} — keeping cached videos")
+            return {"ok": False, "error": "empty search result", "seconds": round(time.monotonic() - t0, 2)}
+        result = _process_v7(raw, seed_query, False, cat_key)
+        await asyncio.to_thread(db.save_cached_videos, result["videos"], cat_key, SCORE_RULES_VERSION)
+        await asyncio.to_thread(db.save_last_seed, cat_key, 0)
+        print(f"✅ Cached {len(result['videos'])} videos for {cat_key}")
+        return {"ok": True, "videos": len(result["videos"]), "seconds": round(time.monotonic() - t0, 2)}
+    except Exception as e:
+        print(f"❌ Error caching {cat_key}: {e}")
+        return {"ok": False, "error": str(e)[:300], "seconds": round(time.monotonic() - t0, 2)}
+
+
 async def populate_initial_cache():
-    """Background: populate cache using seed 0 for each V7 category"""
+    """Background: populate cache using seed 0 for each V7 category (REFRESH_CONCURRENCY at a time)"""
     print("🚀 Starting V7 initial cache population...")
-    for cat_key, cat_data in CATEGORIES_V7.items():
+    t0 = time.monotonic()
+    try:
+        run_id = await asyncio.to_thread(db.start_refresh_run, "categories")
+    except Exception as e:
+        print(f"⚠️ Could not record refresh run: {e}")
+        run_id = None
+    sem = asyncio.Semaphore(REFRESH_CONCURRENCY)
+
+    async def _bounded(cat_key, cat_data):
+        async with sem:
+            return cat_key, await _populate_category(cat_key, cat_data)
+
+    results, ok, status, error = {}, 0, "failed", None
+    try:
+        results = dict(await asyncio.gather(*(_bounded(k, d) for k, d in CATEGORIES_V7.items())))
+        ok = sum(1 for r in results.values() if r["ok"])
+        if ok:
+            await asyncio.to_thread(db.set_config, "last_category_refresh", datetime.now().isoformat())
+        status = "ok" if ok == len(results) else ("partial" if ok else "failed")
+    except Exception as e:
+        print(f"❌ Cache population error: {e}")
+        error = str(e)[:300]
+    finally:
+        # Always close the run, or it stays 'running' in refresh_runs forever
+        if run_id is not None:
+            details = {"categories": results, "concurrency": REFRESH_CONCURRENCY,
+                       "seconds": round(time.monotonic() - t0, 2)}
+            if error: details["error"] = error
+            try:
+                await asyncio.to_thread(db.finish_refresh_run, run_id, status, details)
+            except Exception as e:
+                print(f"⚠️ Could not record refresh run: {e}")
+    print(f"🎉 V7 cache population complete: {ok}/{len(CATEGORIES_V7)} categories ({status})")
+
+
+async def refresh_playlist(priority: str = "interactive"):
+    """Incremental playlist sync: new items are fetched and scored, the rest diffed in place"""
+    print("🔄 Refreshing playlist...")
+    stored = await asyncio.to_thread(db.get_playlist_index)
+    # ETags only help while the rows they describe are still in the table
+    etags = json.loads(await asyncio.to_thread(db.get_config, "playlist_page_etags") or "{}") if stored else {}
+    # offset counts playlist items walked so far; seen dedupes IDs listed more than once
+    new_etags, seen, offset, pages, added, updated, complete = {}, set(), 0, 0, 0, 0, False
+    try:
+        async for token, page in yt_playlist_pages(PLAYLIST_ID, etags, priority):
+            new_etags[token] = {k: page[k] for k in ("etag", "next", "ids")}
+            complete = not page["next"]
+            if page["items"] is None and any(vid not in stored for vid in page["ids"]):
+                new_etags.pop(token)  # rows went missing; refetch this page next time
+            fresh = list({it["snippet"]["resourceId"]["videoId"]: it for it in reversed(page["items"] or [])
+                          if it["snippet"]["resourceId"]["videoId"] not in stored
+                          and it["snippet"]["resourceId"]["videoId"] not in seen}.values())  # first listing wins
+            if fresh:
+                dm = await get_video_details([it["snippet"]["resourceId"]["videoId"] for it in fresh], priority)
+                videos = _process_v7([_playlist_item_to_video(it, dm.get(it["snippet"]["resourceId"]["videoId"], {}))
+                                      for it in fresh], "Playlist", False, "Playlist")["videos"]
+                for v in videos:
+                    v["position"] = offset + page["ids"].index(v["video_id"])
+                await asyncio.to_thread(db.save_playlist_videos, videos, SCORE_RULES_VERSION)
+                added += len(videos)
+            # Existing rows only need their position and posted flag brought up to date
+            known = [(offset + i, vid) for i, vid in enumerate(page["ids"]) if vid in stored]
+            flags = is_posted_many([(stored[vid]["artist"] or "", stored[vid]["song"] or "") for _, vid in known])
+            changes = [(vid, pos, p) for (pos, vid), p in zip(known, flags)
+                       if (stored[vid]["position"], stored[vid]["posted"]) != (pos, p)]
+            if changes:
+                await asyncio.to_thread(db.update_playlist_rows, changes)
+                updated += len(changes)
+            seen.update(page["ids"])
+            offset += len(page["ids"])
+            pages += 1
+    finally:
+        await asyncio.to_thread(db.set_config, "playlist_page_etags", json.dumps(new_etags))
+    removed = await asyncio.to_thread(db.prune_playlist_videos, list(seen)) if complete and seen else 0
+    print(f"✅ Playlist refreshed: {len(seen)} items, +{added} new, {updated} updated, -{removed} removed"
+          f"{'' if complete else ' (incomplete walk, nothing removed)'}")
+    if not complete and pages < PLAYLIST_MAX_PAGES:
+        # Stopped early on an upstream error: this must not pass for a fresh
+        # refresh, so leave the timestamp alone and let the scheduler back off.
+        raise EmptyRefresh("playlist")
+    await asyncio.to_thread(db.set_config, "last_playlist_refresh", datetime.now().isoformat())
+
+
+# ─── REFRESH SCHEDULER ───
+# Requests always get whatever is cached; this loop refreshes categories and
+# the playlist in the background once they pass their soft TTL. A DB lease
+# makes sure only one worker runs a tick at a time.
+
+def _age_seconds(iso: Optional[str]) -> Optional[float]:
+    if not iso: return None
+    try:
+        return (datetime.now() - datetime.fromisoformat(iso)).total_seconds()
+    except ValueError:
+        return None
+
+
+def _jitter(key: str) -> int:
+    # Stable per key, so each category gets its own slot instead of all expiring together
+    return int(hashlib.sha1(key.encode()).hexdigest(), 16) % (REFRESH_JITTER + 1)
+
+
+def stale_refresh_targets(status: dict, attempts: dict = None) -> list:
+    """Category keys (and "playlist") whose data passed soft TTL + jitter, oldest first.
+
+    attempts maps targets to the time of their last failed or empty refresh;
+    those are skipped for REFRESH_RETRY_BACKOFF, since a refresh that stored
+    nothing leaves fetched_at stale and would be picked again every tick.
+    """
+    attempts = attempts or {}
+
+    def backing_off(key):
+        age = _age_seconds(attempts.get(key))
+        return age is not None and age < REFRESH_RETRY_BACKOFF
+
+    due = []
+    for cat in CATEGORIES_V7:
+        info = status["categories"].get(cat)
+        age = _age_seconds(info["last_update"]) if info else None
+        if age is not None and age > CATEGORY_SOFT_TTL + _jitter(cat) and not backing_off(cat):
+            due.append((age, cat))
+    age = _age_seconds(status.get("last_playlist_refresh") or status["playlist"]["last_update"])
+    if age is not None and age > PLAYLIST_SOFT_TTL + _jitter("playlist") and not backing_off("playlist"):
+        due.append((age, "playlist"))
+    return [key for _, key in sorted(due, reverse=True)]
+
+
+async def run_scheduled_refresh() -> list:
+    """One scheduler tick; returns the targets refreshed"""
+    lease_ttl = SCHEDULER_INTERVAL * 2
+    if not await asyncio.to_thread(db.try_acquire_lease, "refresh-scheduler", WORKER_ID, lease_ttl):
+        return []
+    try:
+        done = []
+        status = await asyncio.to_thread(db.get_cache_status)
+        attempts = json.loads(await asyncio.to_thread(db.get_config, "refresh_attempts") or "{}")
+        before = dict(attempts)
+        for target in stale_refresh_targets(status, attempts):
+            try:
+                if target == "playlist":
+                    await single_flight(("playlist",), lambda: refresh_playlist("scheduled"))
+                else:
+                    await single_flight(("category", target), lambda t=target: _refresh_category(t, "scheduled"))
+                done.append(target)
+                attempts.pop(target, None)
+                print(f"🕒 Scheduler refreshed {target}")
+            except QuotaExhausted:
+                print(f"⏸️ Scheduler: 'scheduled' quota budget used up, deferring {target}")
+                break
+            except EmptyRefresh:
+                print(f"⚠️ Scheduler: no results for {target}, retrying in {REFRESH_RETRY_BACKOFF // 3600}h")
+                attempts[target] = datetime.now().isoformat()
+            except Exception as e:
+                print(f"❌ Scheduler refresh error for {target}: {e}")
+                attempts[target] = datetime.now().isoformat()
+        if attempts != before:
+            await asyncio.to_thread(db.set_config, "refresh_attempts", json.dumps(attempts))
+        if PREFETCH_ENABLED:
+            schedule_prefetch()
+        return done
+    finally:
+        # Free the tick for other workers now instead of when the lease expires
         try:
-            seed_query = cat_data["seeds"][0]
-            full_query = f"{seed_query} {ANTI_SPAM}"
-            raw = await yt_search(full_query, 25)
-            result = _process_v7(raw, seed_query, False, cat_key)
-            db.save_cached_videos(result["videos"], cat_key)
-            db.save_last_seed(cat_key, 0)
-            print(f"✅ Cached {len(result['videos'])} videos for {cat_key}")
+            await asyncio.to_thread(db.release_lease, "refresh-scheduler", WORKER_ID)
         except Exception as e:
-            print(f"❌ Error caching {cat_key}: {e}")
-    db.set_config("last_category_refresh", datetime.now().isoformat())
-    print("🎉 V7 cache population complete!")
+            print(f"⚠️ Could not release scheduler lease: {e}")
 
 
-async def refresh_playlist():
-    print("🔄 Refreshing playlist...")
-    raw = await yt_playlist(PLAYLIST_ID, 50)
-    processed = _process_v7(raw, "Playlist", False, "Playlist")
-    db.save_playlist_videos(processed["videos"])
-    db.set_config("last_playlist_refresh", datetime.now().isoformat())
-    print(f"✅ Playlist refreshed: {len(processed['videos'])} videos")
+# ─── SEED PREFETCH ───
+# Fetches and scores each category's *next* seed into category_prefetch while
+# nobody is using the app, on the "prefetch" quota class, so a rotation is a
+# swap of staged rows instead of a live search.
+
+_last_user_request = 0.0
+_prefetch_task = None
+_prefetch_pending = []  # categories waiting for the running prefetch task, in order
+
+
+def mark_user_request():
+    global _last_user_request
+    _last_user_request = time.monotonic()
+
+
+def is_idle() -> bool:
+    return time.monotonic() - _last_user_request > PREFETCH_IDLE_SECONDS
+
+
+async def prefetch_category(category: str) -> bool:
+    # The lease is taken before the "already staged" check: a worker that gets it
+    # after another one finished sees the staged row instead of searching again.
+    lease = f"prefetch:{category}"
+    if not await asyncio.to_thread(db.try_acquire_lease, lease, WORKER_ID, PREFETCH_LEASE_TTL):
+        return False
+    try:
+        cat_data = CATEGORIES_V7[category]
+        total_seeds = len(cat_data["seeds"])
+        last_seed = await asyncio.to_thread(db.get_last_seed, category)
+        next_seed = (last_seed + 1) % total_seeds
+        if await asyncio.to_thread(db.has_prefetched_seed, category, next_seed, PREFETCH_MAX_AGE):
+            return False
+        seed_query = cat_data["seeds"][next_seed]
+        raw = await yt_search(f"{seed_query} {ANTI_SPAM}", 25, "prefetch")
+        if not raw:
+            return False
+        result = _process_v7(raw, seed_query, False, category)
+        await asyncio.to_thread(db.save_prefetched_seed, category, next_seed, seed_query, result["videos"])
+        print(f"📦 Prefetched {category} seed {next_seed}: {len(result['videos'])} videos")
+        return True
+    finally:
+        await asyncio.to_thread(db.release_lease, lease, WORKER_ID)
+
+
+async def run_prefetch() -> list:
+    """Drain _prefetch_pending; categories left when it stops wait for the next trigger"""
+    done = []
+    while _prefetch_pending:
+        cat = _prefetch_pending[0]
+        if not is_idle():
+            await asyncio.sleep(PREFETCH_IDLE_SECONDS)
+            if not is_idle(): break
+        _prefetch_pending.pop(0)
+        try:
+            if await single_flight(("prefetch", cat), lambda c=cat: prefetch_category(c)):
+                done.append(cat)
+        except QuotaExhausted:
+            _prefetch_pending.insert(0, cat)
+            break
+        except Exception as e:
+            print(f"⚠️ Prefetch error for {cat}: {e}")
+    return done
+
+
+def schedule_prefetch(categories=None):
+    """Queue categories (all by default) for prefetch; merged into a run already in progress"""
+    global _prefetch_task
+    for cat in categories or CATEGORIES_V7:
+        if cat not in _prefetch_pending:
+            _prefetch_pending.append(cat)
+    if _prefetch_task is None or _prefetch_task.done():
+        _prefetch_task = asyncio.create_task(run_prefetch())
+
+
+async def refresh_scheduler_loop():
+    while True:
+        await asyncio.sleep(SCHEDULER_INTERVAL * random.uniform(0.8, 1.2))
+        try:
+            await run_scheduled_refresh()
+        except Exception as e:
+            print(f"⚠️ Scheduler tick error: {e}")
 
 
 # ─── ENDPOINTS ───
@@ -518,9 +1520,19 @@ async def debug_ffmpeg():
         info["which_ffmpeg"] = "not found"
     return info
 
+@app.get("/api/debug/http")
+async def debug_http():
+    """Outbound connection pools: per-upstream request/error counters and open/idle connections"""
+    return http_pool_stats()
+
+@app.get("/api/debug/db")
+async def debug_db():
+    """PostgreSQL pools: size, available connections, waiting requests, errors"""
+    return {"sync": db.get_pool_stats(), "async": adb.get_pool_stats()}
+
 @app.get("/api/health")
 async def health():
-    quota = db.get_quota_status()
+    quota = quota_counters.status()
     return {
         "status": "ok", "version": "V7",
         "youtube_api": bool(YOUTUBE_API_KEY),
@@ -531,25 +1543,33 @@ async def health():
 @app.get("/api/search")
 async def search(q: str = Query(...), max_results: int = Query(10, ge=1, le=50), hide_posted: bool = Query(True)):
     """Manual search with anti-spam filtering"""
+    mark_user_request()
     full_query = f"{q} opera live {ANTI_SPAM}"
-    raw = await yt_search(full_query, max_results)
-    return _process_v7(raw, q, hide_posted)
+    raw, cached = await yt_search_cached(full_query, max_results)
+    result = _process_v7(raw, q, hide_posted)
+    result["cached"] = cached
+    return result
 
 @app.get("/api/category/{category}")
 async def search_category(category: str, hide_posted: bool = Query(True), force_refresh: bool = Query(False)):
     """Category search with V7 seed rotation"""
+    mark_user_request()
     cat_data = CATEGORIES_V7.get(category)
     if not cat_data:
         raise HTTPException(404, f"Categoria nao encontrada: {category}")
 
-    last_seed = db.get_last_seed(category)
+    last_seed = await adb.get_last_seed(category)
     total_seeds = len(cat_data["seeds"])
 
     # Serve from cache unless force_refresh
     if not force_refresh:
-        cached = db.get_cached_videos(category, hide_posted)
+        cached = await adb.get_cached_videos(category, hide_posted)
         if cached:
-            cached = _rescore_cached(cached, category)
+            if any(v["score"]["version"] != SCORE_RULES_VERSION for v in cached):
+                # Rows predate the current rules: score this response in memory
+                # and let the background pass fix the stored rows once.
+                cached = _rescore_cached(cached, category)
+                schedule_rescore()
             print(f"✅ Serving {len(cached)} cached videos for {category}")
             return {
                 "query": category, "category": category,
@@ -559,44 +1579,90 @@ async def search_category(category: str, hide_posted: bool = Query(True), force_
                 "seed_query": cat_data["seeds"][last_seed % total_seeds],
             }
 
-    # Rotate to next seed
+    # Rotate to next seed (concurrent refreshes of this category share one fetch)
+    try:
+        result = await single_flight(("category", category), lambda: _refresh_category(category))
+    except (QuotaExhausted, EmptyRefresh) as e:
+        # Cache-only mode: keep the current seed and serve what is stored
+        cached = await adb.get_cached_videos(category, hide_posted)
+        return {
+            "query": category, "category": category,
+            "total_found": len(cached), "posted_hidden": 0,
+            "videos": cached, "cached": True, "quota_exhausted": isinstance(e, QuotaExhausted),
+            "seed_index": last_seed, "total_seeds": total_seeds,
+            "seed_query": cat_data["seeds"][last_seed % total_seeds],
+        }
+    return {**_hide_posted(result, hide_posted), "cached": False}
+
+
+class EmptyRefresh(Exception):
+    """A refresh came back empty (category search) or incomplete (playlist walk)"""
+
+
+async def _refresh_category(category: str, priority: str = "interactive") -> dict:
+    """Advance the category to its next seed, fetch, score and cache it (all videos, posted included)"""
+    cat_data = CATEGORIES_V7[category]
+    total_seeds = len(cat_data["seeds"])
+    last_seed = await asyncio.to_thread(db.get_last_seed, category)
     next_seed = (last_seed + 1) % total_seeds
     seed_query = cat_data["seeds"][next_seed]
     full_query = f"{seed_query} {ANTI_SPAM}"
 
-    print(f"🔍 V7 category '{category}' seed {next_seed}/{total_seeds}: {seed_query[:50]}...")
-    raw = await yt_search(full_query, 25)
-    db.save_last_seed(category, next_seed)
-
-    result = _process_v7(raw, seed_query, hide_posted, category)
-    db.save_cached_videos(result["videos"], category)
-    result["cached"] = False
+    staged = await asyncio.to_thread(db.take_prefetched_seed, category, next_seed, PREFETCH_MAX_AGE)
+    if staged:
+        # Rescored below, so posted flags and rules are current at swap time
+        print(f"⚡ V7 category '{category}' seed {next_seed}/{total_seeds}: using prefetched results")
+        raw = staged
+    else:
+        print(f"🔍 V7 category '{category}' seed {next_seed}/{total_seeds}: {seed_query[:50]}...")
+        raw = await yt_search(full_query, 25, priority)
+    if not raw:
+        # yt_search returns [] on upstream errors: keep the seed and the cached generation
+        raise EmptyRefresh(category)
+    await asyncio.to_thread(db.save_last_seed, category, next_seed)
+    if PREFETCH_ENABLED:
+        schedule_prefetch([category])
+
+    result = _process_v7(raw, seed_query, False, category)
+    await asyncio.to_thread(db.save_cached_videos, result["videos"], category, SCORE_RULES_VERSION)
     result["seed_index"] = next_seed
     result["total_seeds"] = total_seeds
     result["seed_query"] = seed_query
     return result
 
 @app.get("/api/ranking")
-async def ranking(hide_posted: bool = Query(True)):
+async def ranking(hide_posted: bool = Query(True), live: bool = Query(False),
+                  limit: int = Query(60, ge=1, le=500)):
+    """Cross-category leaderboard from the category cache (live=true: six live searches)"""
+    if live:
+        return await _ranking_live(hide_posted)
+    videos, hidden = await adb.get_ranking_videos(hide_posted, limit)
+    return {"query": "ranking", "category": None, "total_found": len(videos),
+            "posted_hidden": hidden, "videos": videos, "cached": True}
+
+
+async def _ranking_live(hide_posted: bool):
     """Ranking across all V7 categories using first seed each"""
     all_q = [(key, data["seeds"][0]) for key, data in CATEGORIES_V7.items()]
-    tasks = [yt_search(f"{q} {ANTI_SPAM}", 10) for _, q in all_q]
+    tasks = [yt_search_cached(f"{q} {ANTI_SPAM}", 10) for _, q in all_q]
     batches = await asyncio.gather(*tasks, return_exceptions=True)
     seen = set(); merged = []
-    for i, batch in enumerate(batches):
-        if isinstance(batch, Exception): continue
+    for i, res in enumerate(batches):
+        if isinstance(res, Exception): continue
+        batch, _ = res
         cat = all_q[i][0]
         for v in batch:
             if v["video_id"] not in seen:
-                seen.add(v["video_id"]); v["category"] = cat; merged.append(v)
+                seen.add(v["video_id"]); merged.append({**v, "category": cat})
     return _process_v7(merged, "ranking", hide_posted)
 
 @app.get("/api/categories")
 async def list_categories():
     """List V7 categories with seed info"""
     cats = []
+    seeds = await adb.get_last_seeds()
     for key, data in CATEGORIES_V7.items():
-        last_seed = db.get_last_seed(key)
+        last_seed = seeds.get(key, 0)
         cats.append({
             "key": key, "name": data["name"], "emoji": data["emoji"],
             "desc": data["desc"], "total_seeds": len(data["seeds"]),
@@ -607,17 +1673,66 @@ async def list_categories():
 
 @app.get("/api/posted")
 async def get_posted():
-    return {"count": len(posted_registry)}
+    return {"count": len(posted_registry), "last_sync_id": posted_sync_id}
+
+@app.post("/api/posted")
+async def add_posted(body: dict = Body(...)):
+    """Mark videos as posted: {"artist", "song"} or {"entries": [{"artist", "song"}, ...]}"""
+    raw = body.get("entries") if "entries" in body else [body]
+    if not isinstance(raw, list) or not raw:
+        raise HTTPException(400, "Nothing to add")
+    entries = []
+    for e in raw:
+        if not isinstance(e, dict):
+            raise HTTPException(400, "Each entry must be an object")
+        a = str(e.get("artist") or "").strip()
+        s = str(e.get("song") or "").strip()
+        if not normalize_str(a):
+            raise HTTPException(400, "Each entry needs an artist")
+        entries.append({"artist": a, "song": s, "artist_norm": normalize_str(a), "song_norm": normalize_str(s)})
+    added = await asyncio.to_thread(db.save_posted_entries, entries, "api")
+    await sync_posted()
+    return {"added": len(added), "skipped": len(entries) - len(added), "count": len(posted_registry)}
 
 @app.get("/api/posted/check")
 async def check_posted(artist: str = "", song: str = ""):
     return {"posted": is_posted(artist, song)}
 
+POSTED_BATCH_MAX = 1000
+
+@app.post("/api/posted/check-batch")
+async def check_posted_batch(body: dict = Body(...)):
+    """Check many pairs in one call: {"pairs": [{"artist": "...", "song": "..."}, ...]}"""
+    pairs = body.get("pairs")
+    if not isinstance(pairs, list):
+        raise HTTPException(400, "Body must contain a 'pairs' list")
+    if len(pairs) > POSTED_BATCH_MAX:
+        raise HTTPException(400, f"Too many pairs (max {POSTED_BATCH_MAX})")
+    items = []
+    for p in pairs:
+        if isinstance(p, dict):
+            items.append((str(p.get("artist") or ""), str(p.get("song") or "")))
+        elif isinstance(p, (list, tuple)) and len(p) == 2:
+            items.append((str(p[0] or ""), str(p[1] or "")))
+        else:
+            raise HTTPException(400, "Each pair must be {artist, song} or [artist, song]")
+    results = is_posted_many(items)
+    return {"results": results, "posted_count": sum(results), "total": len(results)}
+
 
 # ─── CACHE ENDPOINTS ───
 @app.get("/api/cache/status")
 async def cache_status():
-    return db.get_cache_status()
+    status = db.get_cache_status()
+    status["search_cache"] = {**db.get_search_cache_status(), "ttl_seconds": SEARCH_CACHE_TTL,
+                              "max_entries": SEARCH_CACHE_MAX}
+    status["scheduler"] = {"enabled": SCHEDULER_ENABLED, "due": stale_refresh_targets(status)}
+    status["prefetch"] = {"enabled": PREFETCH_ENABLED, "staged": db.get_prefetch_status()}
+    return status
+
+@app.get("/api/cache/refresh-runs")
+async def cache_refresh_runs(limit: int = Query(20, ge=1, le=100)):
+    return {"runs": db.get_refresh_runs(limit)}
 
 @app.post("/api/cache/populate-initial")
 async def populate_cache(background_tasks: BackgroundTasks):
@@ -635,7 +1750,13 @@ async def refresh_categories(background_tasks: BackgroundTasks):
 async def get_playlist(hide_posted: bool = Query(True)):
     videos = db.get_playlist_videos(hide_posted)
     if not videos:
-        await refresh_playlist()
+        try:
+            await single_flight(("playlist",), refresh_playlist)
+        except EmptyRefresh:
+            pass  # serve whatever the partial walk stored
+        except QuotaExhausted:
+            return {"total_found": 0, "videos": [], "playlist_id": PLAYLIST_ID, "cached": True,
+                    "quota_exhausted": True}
         videos = db.get_playlist_videos(hide_posted)
     return {"total_found": len(videos), "videos": videos, "playlist_id": PLAYLIST_ID, "cached": True}
 
@@ -648,12 +1769,12 @@ async def refresh_playlist_endpoint(background_tasks: BackgroundTasks):
 # ─── QUOTA ENDPOINTS (V7) ───
 @app.get("/api/quota/status")
 async def quota_status():
-    return db.get_quota_status()
+    return {**quota_counters.status(), "budget": quota_budget()}
 
 @app.post("/api/quota/register")
 async def quota_register(search_calls: int = Query(0), detail_calls: int = Query(0)):
-    db.register_quota_usage(search_calls, detail_calls)
-    return db.get_quota_status()
+    quota_counters.add(search_calls=search_calls, detail_calls=detail_calls)
+    return quota_counters.status()
 
 
 # ─── DOWNLOAD ENDPOINTS ───
@@ -738,8 +1859,19 @@ LANG_NAMES = {"en": "English", "pt": "Portugues", "es": "Espanol", "fr": "Franca
 
 
 @app.get("/api/prod/projects")
-async def prod_list_projects():
-    return {"projects": db.get_production_projects()}
+async def prod_list_projects(limit: int = Query(50, ge=1, le=200), cursor: Optional[str] = Query(None),
+                             status: Optional[str] = Query(None)):
+    """Newest first, keyset-paginated: pass next_cursor back as cursor for the following page"""
+    after = None
+    if cursor:
+        try:
+            created, pid = cursor.rsplit("|", 1)
+            after = (datetime.fromisoformat(created), int(pid))
+        except ValueError:
+            raise HTTPException(400, "Invalid cursor")
+    projects = await adb.get_production_projects(limit, after, status)
+    last = projects[-1] if len(projects) == limit else None
+    return {"projects": projects, "next_cursor": f"{last['created_at']}|{last['id']}" if last else None}
 
 
 @app.post("/api/prod/projects")
@@ -779,7 +1911,7 @@ async def prod_create_project(
     except Exception as e:
         print(f"⚠️ duration detection error: {e}")
 
-    pid = db.create_production_project(
+    pid = await adb.create_production_project(
         artist=artist, song=song, hook=hook or None,
         cut_start=cut_start, cut_end=cut_end if cut_end > 0 else None,
         video_filename=f"{project_name}.mp4", video_path=str(video_path),
@@ -789,8 +1921,9 @@ async def prod_create_project(
 
 
 @app.get("/api/prod/projects/{project_id}")
-async def prod_get_project(project_id: int):
-    proj = db.get_production_project(project_id)
+async def prod_get_project(project_id: int, translations: bool = True):
+    """translations=false leaves the payload out and lists translation_langs (see /translations/{lang})"""
+    proj = await adb.get_production_project(project_id, with_translations=translations)
     if not proj:
         raise HTTPException(404, "Project not found")
     return proj
@@ -798,7 +1931,7 @@ async def prod_get_project(project_id: int):
 
 @app.delete("/api/prod/projects/{project_id}")
 async def prod_delete_project(project_id: int):
-    proj = db.get_production_project(project_id)
+    proj = await adb.get_production_project(project_id, with_translations=False)
     if not proj:
         raise HTTPException(404, "Project not found")
     # Clean up project folder
@@ -807,13 +1940,13 @@ async def prod_delete_project(project_id: int):
         project_dir = video_file.parent.parent  # video is in project_dir/video/
         if project_dir.exists() and str(project_dir).startswith(str(PROJECTS_DIR)):
             shutil.rmtree(project_dir, ignore_errors=True)
-    db.delete_production_project(project_id)
+    await adb.delete_production_project(project_id)
     return {"ok": True}
 
 
 @app.get("/api/prod/projects/{project_id}/video")
 async def prod_video(project_id: int):
-    proj = db.get_production_project(project_id)
+    proj = await adb.get_production_project(project_id, with_translations=False)
     if not proj or not proj.get("video_path"):
         raise HTTPException(404, "Video not found")
     video_path = Path(proj["video_path"])
@@ -824,22 +1957,54 @@ async def prod_video(project_id: int):
 
 @app.get("/api/prod/projects/{project_id}/status")
 async def prod_get_status(project_id: int):
-    proj = db.get_production_project(project_id)
-    if not proj:
+    status = await adb.get_production_status(project_id)
+    if not status:
         raise HTTPException(404, "Project not found")
-    return {
-        "id": proj["id"], "status": proj["status"],
-        "overlay_approved": proj["overlay_approved"],
-        "post_approved": proj["post_approved"],
-        "error_message": proj.get("error_message"),
-    }
+    return status
+
+
+@app.get("/api/prod/projects/{project_id}/events")
+async def prod_status_events(project_id: int):
+    """Server-sent events: the /status payload now and again after every change"""
+    if not await adb.get_production_status(project_id):
+        raise HTTPException(404, "Project not found")
+
+    async def stream():
+        # Subscribed inside the generator: if the client leaves before the first
+        # chunk the generator never starts, and there is nothing to clean up.
+        # The first status is read after subscribing so no change falls between.
+        queue = project_events.subscribe(project_id)
+        try:
+            last = await adb.get_production_status(project_id)
+            if last is None:
+                yield "event: gone\ndata: {}\n\n"
+                return
+            yield f"data: {json.dumps(last)}\n\n"
+            while True:
+                try:
+                    await asyncio.wait_for(queue.get(), SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                current = await adb.get_production_status(project_id)
+                if current is None:
+                    yield "event: gone\ndata: {}\n\n"
+                    return
+                if current != last:
+                    last = current
+                    yield f"data: {json.dumps(last)}\n\n"
+        finally:
+            project_events.unsubscribe(project_id, queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 # ─── TRANSCRIPTION ───
 
 async def _bg_transcribe(project_id: int):
     try:
-        proj = db.get_production_project(project_id)
+        proj = db.get_production_project(project_id, with_translations=False)
         if not proj or not proj.get("video_path"):
             db.update_production_status(project_id, "error", "Video file not found")
             return
@@ -864,7 +2029,7 @@ async def _bg_transcribe(project_id: int):
             return
 
         # Send to Whisper API
-        async with httpx.AsyncClient(timeout=300) as client:
+        async with upstream("openai") as client:
             with open(audio_path, "rb") as af:
                 files = {"file": ("audio.wav", af, "audio/wav")}
                 whisper_lang = proj.get("language") or "en"
@@ -894,7 +2059,7 @@ async def _bg_transcribe(project_id: int):
 
 @app.post("/api/prod/projects/{project_id}/transcribe")
 async def prod_transcribe(project_id: int, background_tasks: BackgroundTasks):
-    proj = db.get_production_project(project_id)
+    proj = await adb.get_production_status(project_id)
     if not proj:
         raise HTTPException(404, "Project not found")
     if proj["status"] not in ("uploaded", "error", "transcribed"):
@@ -905,12 +2070,12 @@ async def prod_transcribe(project_id: int, background_tasks: BackgroundTasks):
 
 @app.put("/api/prod/projects/{project_id}/transcription")
 async def prod_update_transcription(project_id: int, body: dict = Body(...)):
-    proj = db.get_production_project(project_id)
+    proj = await adb.get_production_project(project_id, with_translations=False)
     if not proj:
         raise HTTPException(404, "Project not found")
     transcription = body.get("transcription", "")
     segments = body.get("segments", proj.get("transcription_segments"))
-    db.update_production_transcription(project_id, transcription, segments)
+    await adb.update_production_transcription(project_id, transcription, segments)
     return {"ok": True}
 
 
@@ -918,10 +2083,9 @@ async def prod_update_transcription(project_id: int, body: dict = Body(...)):
 
 @app.put("/api/prod/projects/{project_id}/official-lyrics")
 async def prod_update_official_lyrics(project_id: int, body: dict = Body(...)):
-    proj = db.get_production_project(project_id)
-    if not proj:
+    if not await adb.get_production_status(project_id):
         raise HTTPException(404, "Project not found")
-    db.update_production_official_lyrics(project_id, body.get("official_lyrics", ""))
+    await adb.update_production_official_lyrics(project_id, body.get("official_lyrics", ""))
     return {"ok": True}
 
 
@@ -995,7 +2159,7 @@ Return ONLY valid JSON, no markdown wrapping, no explanation."""
 
 async def _bg_generate(project_id: int):
     try:
-        proj = db.get_production_project(project_id)
+        proj = db.get_production_project(project_id, with_translations=False)
         if not proj:
             db.update_production_status(project_id, "error", "Project not found")
             return
@@ -1018,7 +2182,7 @@ async def _bg_generate(project_id: int):
             transcription=proj.get("transcription") or "(no transcription available)"
         )
 
-        async with httpx.AsyncClient(timeout=120) as client:
+        async with upstream("anthropic") as client:
             resp = await client.post(
                 "https://api.anthropic.com/v1/messages",
                 headers={
@@ -1063,7 +2227,7 @@ async def _bg_generate(project_id: int):
 
 @app.post("/api/prod/projects/{project_id}/generate")
 async def prod_generate(project_id: int, background_tasks: BackgroundTasks):
-    proj = db.get_production_project(project_id)
+    proj = await adb.get_production_status(project_id)
     if not proj:
         raise HTTPException(404, "Project not found")
     if proj["status"] not in ("transcribed", "generated", "error"):
@@ -1077,7 +2241,7 @@ async def prod_generate(project_id: int, background_tasks: BackgroundTasks):
 async def _bg_regenerate(project_id: int, regen_type: str):
     """Regenerate only overlay or only post, keeping the other unchanged."""
     try:
-        proj = db.get_production_project(project_id)
+        proj = db.get_production_project(project_id, with_translations=False)
         if not proj:
             db.update_production_status(project_id, "error", "Project not found")
             return
@@ -1098,7 +2262,7 @@ async def _bg_regenerate(project_id: int, regen_type: str):
             transcription=proj.get("transcription") or "(no transcription available)"
         )
 
-        async with httpx.AsyncClient(timeout=120) as client:
+        async with upstream("anthropic") as client:
             resp = await client.post(
                 "https://api.anthropic.com/v1/messages",
                 headers={
@@ -1132,12 +2296,7 @@ async def _bg_regenerate(project_id: int, regen_type: str):
             seo = content.get("seo", {})
             db.update_production_post(project_id, post_text, False)
             # Also update SEO since it's related to post
-            conn = db._conn()
-            c = conn.cursor()
-            c.execute("UPDATE production_projects SET youtube_seo = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
-                      (json.dumps(seo), project_id))
-            conn.commit()
-            conn.close()
+            db.update_production_seo(project_id, seo)
 
         db.update_production_status(project_id, "generated")
 
@@ -1149,7 +2308,7 @@ async def _bg_regenerate(project_id: int, regen_type: str):
 
 @app.post("/api/prod/projects/{project_id}/regenerate-overlay")
 async def prod_regenerate_overlay(project_id: int, background_tasks: BackgroundTasks):
-    proj = db.get_production_project(project_id)
+    proj = await adb.get_production_project(project_id, with_translations=False)
     if not proj:
         raise HTTPException(404, "Project not found")
     if not proj.get("overlay_subtitles"):
@@ -1160,7 +2319,7 @@ async def prod_regenerate_overlay(project_id: int, background_tasks: BackgroundT
 
 @app.post("/api/prod/projects/{project_id}/regenerate-post")
 async def prod_regenerate_post(project_id: int, background_tasks: BackgroundTasks):
-    proj = db.get_production_project(project_id)
+    proj = await adb.get_production_project(project_id, with_translations=False)
     if not proj:
         raise HTTPException(404, "Project not found")
     if not proj.get("post_text"):
@@ -1173,37 +2332,37 @@ async def prod_regenerate_post(project_id: int, background_tasks: BackgroundTask
 
 @app.put("/api/prod/projects/{project_id}/overlay")
 async def prod_update_overlay(project_id: int, body: dict = Body(...), background_tasks: BackgroundTasks = None):
-    proj = db.get_production_project(project_id)
+    proj = await adb.get_production_project(project_id, with_translations=False)
     if not proj:
         raise HTTPException(404, "Project not found")
     overlay = body.get("overlay", proj.get("overlay_subtitles") or [])
     approved = body.get("approved", False)
-    db.update_production_overlay(project_id, overlay, approved)
+    await adb.update_production_overlay(project_id, overlay, approved)
 
     # Auto-trigger translation if both approved
     if approved:
-        proj_updated = db.get_production_project(project_id)
+        proj_updated = await adb.get_production_status(project_id)
         if proj_updated and proj_updated.get("post_approved"):
             background_tasks.add_task(_bg_translate, project_id)
-            db.update_production_status(project_id, "translating")
+            await adb.update_production_status(project_id, "translating")
     return {"ok": True, "overlay_approved": approved}
 
 
 @app.put("/api/prod/projects/{project_id}/post")
 async def prod_update_post(project_id: int, body: dict = Body(...), background_tasks: BackgroundTasks = None):
-    proj = db.get_production_project(project_id)
+    proj = await adb.get_production_project(project_id, with_translations=False)
     if not proj:
         raise HTTPException(404, "Project not found")
     post_text = body.get("post_text", proj.get("post_text") or "")
     approved = body.get("approved", False)
-    db.update_production_post(project_id, post_text, approved)
+    await adb.update_production_post(project_id, post_text, approved)
 
     # Auto-trigger translation if both approved
     if approved:
-        proj_updated = db.get_production_project(project_id)
+        proj_updated = await adb.get_production_status(project_id)
         if proj_updated and proj_updated.get("overlay_approved"):
             background_tasks.add_task(_bg_translate, project_id)
-            db.update_production_status(project_id, "translating")
+            await adb.update_production_status(project_id, "translating")
     return {"ok": True, "post_approved": approved}
 
 
@@ -1251,7 +2410,7 @@ async def _bg_translate(project_id: int):
             "lyrics": lyrics_segments,
         }}
 
-        async with httpx.AsyncClient(timeout=60) as client:
+        async with upstream("translate") as client:
             for lang in target_langs:
                 try:
                     # Translate overlay texts
@@ -1298,10 +2457,39 @@ async def _bg_translate(project_id: int):
         db.update_production_status(project_id, "error", f"Translation failed: {str(e)[:300]}")
 
 
+@app.get("/api/prod/projects/{project_id}/translations")
+async def prod_translation_langs(project_id: int):
+    langs = await adb.get_production_translation_langs(project_id)
+    if langs is None:
+        raise HTTPException(404, "Project not found")
+    return {"languages": langs}
+
+
+@app.get("/api/prod/projects/{project_id}/translations/{lang}")
+async def prod_get_translation(project_id: int, lang: str):
+    data = await adb.get_production_translation(project_id, lang)
+    if data is None:
+        raise HTTPException(404, f"No '{lang}' translation for this project")
+    if not isinstance(data, dict):
+        return {"lang": lang, "value": data}  # legacy non-object entry, returned as stored
+    return {"lang": lang, **data}
+
+
+@app.put("/api/prod/projects/{project_id}/translations/{lang}")
+async def prod_update_translation(project_id: int, lang: str, body: dict = Body(...)):
+    if lang not in PROD_LANGUAGES:
+        raise HTTPException(400, f"Unsupported language '{lang}'")
+    data = {k: body[k] for k in ("overlay", "post", "seo", "lyrics") if k in body}
+    if not data:
+        raise HTTPException(400, "Nothing to update")
+    if not await adb.update_production_translation(project_id, lang, data):
+        raise HTTPException(404, "Project not found")
+    return {"ok": True}
+
+
 @app.post("/api/prod/projects/{project_id}/translate")
 async def prod_translate(project_id: int, background_tasks: BackgroundTasks):
-    proj = db.get_production_project(project_id)
-    if not proj:
+    if not await adb.get_production_status(project_id):
         raise HTTPException(404, "Project not found")
     background_tasks.add_task(_bg_translate, project_id)
     return {"status": "translating"}
@@ -1411,7 +2599,7 @@ async def _bg_process(project_id: int):
 
 @app.post("/api/prod/projects/{project_id}/process")
 async def prod_process(project_id: int, background_tasks: BackgroundTasks):
-    proj = db.get_production_project(project_id)
+    proj = await adb.get_production_status(project_id)
     if not proj:
         raise HTTPException(404, "Project not found")
     if proj["status"] not in ("translated", "completed", "error"):
@@ -1424,7 +2612,7 @@ async def prod_process(project_id: int, background_tasks: BackgroundTasks):
 
 @app.get("/api/prod/projects/{project_id}/export")
 async def prod_export(project_id: int):
-    proj = db.get_production_project(project_id)
+    proj = await adb.get_production_project(project_id, with_translations=False)
     if not proj:
         raise HTTPException(404, "Project not found")
     if not proj.get("output_path"):